@@ -0,0 +1,67 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+from fastapi import Request, Response
+
+from app.core.cache import CachedResponse
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Strong entity tag for the representation identified by `parts`.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def validator_headers(etag: str, last_modified: datetime | None) -> dict[str, str]:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            last_modified.astimezone(timezone.utc), usegmt=True
+        )
+    return headers
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: datetime | None
+) -> bool:
+    """
+    Whether the client's cached copy is still current.
+
+    If-None-Match takes precedence over If-Modified-Since and is compared
+    weakly, so a W/ prefix added by a compressing proxy still matches.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have a one second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+
+def not_modified_response(etag: str, last_modified: datetime | None) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+
+def cached_json_response(request: Request, cached: CachedResponse) -> Response:
+    if is_not_modified(request, cached.etag, cached.last_modified):
+        return not_modified_response(cached.etag, cached.last_modified)
+    return Response(
+        content=cached.content,
+        media_type="application/json",
+        headers=validator_headers(cached.etag, cached.last_modified),
+    )
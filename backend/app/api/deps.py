@@ -1,17 +1,22 @@
-from collections.abc import Generator
-from typing import Annotated
+import time
+import uuid
+from collections.abc import AsyncGenerator, Callable, Generator
+from typing import Annotated, Any
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
+from sqlalchemy.orm import defer
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import security
+from app.core.cache import AuthUser, token_cache, user_cache
 from app.core.config import settings
-from app.core.db import engine
-from app.models import TokenPayload, User
+from app.core.db import async_engine, engine
+from app.models import ArticlePublic, TokenPayload, User, UserPublic
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
@@ -23,11 +28,24 @@ def get_db() -> Generator[Session, None, None]:
         yield session
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSession(async_engine) as session:
+        yield session
+
+
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+def get_token_data(token: str) -> TokenPayload:
+    """
+    Verified payload of an access token. Verified tokens are cached until
+    they expire, so each one is only decoded once per worker.
+    """
+    token_data = token_cache.get(token)
+    if token_data is not None:
+        return token_data
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
@@ -38,7 +56,21 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.sub)
+    expires_in = payload["exp"] - time.time() if "exp" in payload else None
+    token_cache.set(token, token_data, ttl=expires_in)
+    return token_data
+
+
+def get_current_user(session: SessionDep, token: TokenDep) -> User:
+    # Only sync routes need the whole user, this shares their session and
+    # connection instead of checking out an async one as well
+    token_data = get_token_data(token)
+    # The hash is only loaded by the routes that check it, on first access
+    user = session.get(
+        User,
+        token_data.sub,
+        options=[defer(User.hashed_password)],  # type: ignore[arg-type]
+    )
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
@@ -49,9 +81,110 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
+async def get_current_auth_user(session: AsyncSessionDep, token: TokenDep) -> AuthUser:
+    """
+    Like get_current_user for routes that only need the user's id and flags,
+    which are cached for AUTH_USER_CACHE_TTL_SECONDS to skip the user lookup.
+    """
+    token_data = get_token_data(token)
+    try:
+        user_id = uuid.UUID(token_data.sub)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    auth_user = user_cache.get(user_id)
+    if auth_user is None:
+        user = await session.get(User, user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        auth_user = AuthUser(
+            id=user.id, is_active=user.is_active, is_superuser=user.is_superuser
+        )
+        user_cache.set(user_id, auth_user)
+    if not auth_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return auth_user
+
+
+CurrentAuthUser = Annotated[AuthUser, Depends(get_current_auth_user)]
+
+
 def get_current_active_superuser(current_user: CurrentUser) -> User:
+    # Built on get_current_user so sync routes only use the sync pool
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=403, detail="The user doesn't have enough privileges"
+        )
+    return current_user
+
+
+def get_current_auth_superuser(current_user: CurrentAuthUser) -> AuthUser:
+    """
+    Like get_current_active_superuser for async routes and routes that use no
+    session of their own.
+    """
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+
+def parse_names(value: str | None, allowed: list[str], what: str) -> list[str] | None:
+    """
+    The comma separated names of `value`, in the order of `allowed`.
+    """
+    if value is None:
+        return None
+    names = {name.strip() for name in value.split(",")} - {""}
+    unknown = names - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=422, detail=f"Unknown {what}: {', '.join(sorted(unknown))}"
+        )
+    if not names:
+        raise HTTPException(status_code=422, detail=f"No {what} selected")
+    return [name for name in allowed if name in names]
+
+
+def public_fields(model: Any) -> Callable[[str | None], list[str] | None]:
+    """
+    Dependency reading a sparse fieldset of `model` from `?fields=`.
+
+    The chosen fields come back in the model's own order, None stands for
+    all of them.
+    """
+    allowed = list(model.model_fields)
+
+    def get_fields(
+        fields: Annotated[
+            str | None,
+            Query(description=f"Comma separated subset of: {', '.join(allowed)}"),
+        ] = None,
+    ) -> list[str] | None:
+        return parse_names(fields, allowed, "fields")
+
+    return get_fields
+
+
+# Relations of an article that can be embedded in it
+ARTICLE_EXPANSIONS = ["article_type", "owner"]
+
+
+def get_article_expand(
+    expand: Annotated[
+        str | None,
+        Query(
+            description="Comma separated relations to embed: "
+            + ", ".join(ARTICLE_EXPANSIONS)
+        ),
+    ] = None,
+) -> list[str] | None:
+    return parse_names(expand, ARTICLE_EXPANSIONS, "expansions")
+
+
+ArticleFieldsDep = Annotated[list[str] | None, Depends(public_fields(ArticlePublic))]
+ArticleExpandDep = Annotated[list[str] | None, Depends(get_article_expand)]
+UserFieldsDep = Annotated[list[str] | None, Depends(public_fields(UserPublic))]
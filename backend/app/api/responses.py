@@ -0,0 +1,24 @@
+from typing import Any
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse encoding with pydantic-core instead of the stdlib json.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def projected_json_response(content: dict[str, Any]) -> Response:
+    """
+    `content` dumped to JSON bytes as is, without validation.
+
+    Meant for pages whose data are dicts read from the columns of their
+    public model: the database already gave them that shape and those types.
+    """
+    return Response(to_json(content), media_type="application/json")
@@ -1,49 +1,106 @@
 import uuid
-from typing import Any
+from typing import Any, cast
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, HTTPException, Request, Response
+from sqlmodel import Session, col, func, select
 
-from app.api.deps import CurrentUser, SessionDep
+from app import crud
+from app.api.conditional import (
+    cached_json_response,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    validator_headers,
+)
+from app.api.deps import AsyncSessionDep, CurrentAuthUser
+from app.core.cache import CachedResponse, article_cache, response_cache
+from app.core.config import CountStrategy, settings
 from app.models import (
     ArticleType,
     ArticleTypeCreate,
     ArticleTypesPublic,
     ArticleTypeUpdate,
     Message,
+    RowCount,
 )
 
 router = APIRouter(prefix="/article_types", tags=["article_types"])
 
 
 @router.get("/", response_model=ArticleTypesPublic)
-def read_article_types(
-    session: SessionDep, skip: int = 0, limit: int = 100
+async def read_article_types(
+    session: AsyncSessionDep,
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    count_strategy: CountStrategy | None = None,
 ) -> Any:
     """
     Retrieve artilce types.
+
+    Supports conditional requests with If-None-Match.
     """
-    count_statement = select(func.count()).select_from(ArticleType)
-    count = session.exec(count_statement).one()
-    statement = select(ArticleType).offset(skip).limit(limit)
-    article_types = session.exec(statement).all()
-    return ArticleTypesPublic(data=article_types, count=count)
+    count_strategy = count_strategy or settings.LIST_COUNT_STRATEGY
+    key, cached = await response_cache.lookup_async(
+        "article_types",
+        {"skip": skip, "limit": limit, "count_strategy": count_strategy},
+        tables=["articletype"],
+    )
+    if cached is not None:
+        return cached_json_response(request, cached)
+    # Any insert or update moves the latest updated_at, any delete the row
+    # counter. Deletes move no date, so the list has no Last-Modified
+    total = (
+        select(RowCount.count)
+        .where(RowCount.table_name == "articletype")
+        .scalar_subquery()
+    )
+    validators = select(total, func.max(col(ArticleType.updated_at)))
+    total, latest = (await session.exec(validators)).one()
+    etag = make_etag("article_types", total, latest, skip, limit, count_strategy)
+    if is_not_modified(request, etag, None):
+        return not_modified_response(etag, None)
+    article_types, count = await session.run_sync(
+        lambda sync_session: crud.get_page(
+            session=cast(Session, sync_session),
+            statement=select(ArticleType),
+            order_by=[col(ArticleType.id)],
+            limit=limit,
+            skip=skip,
+            count_strategy=count_strategy,
+        )
+    )
+    page = ArticleTypesPublic(data=article_types, count=count)
+    cached = CachedResponse(content=page.model_dump_json().encode(), etag=etag)
+    await response_cache.set_async(key, cached)
+    return cached_json_response(request, cached)
 
 
 @router.get("/{id}", response_model=ArticleType)
-def read_article_type(session: SessionDep, id: uuid.UUID) -> Any:
+async def read_article_type(
+    session: AsyncSessionDep, request: Request, response: Response, id: uuid.UUID
+) -> Any:
     """
     Get article type by ID.
+
+    Supports conditional requests with If-None-Match and If-Modified-Since.
     """
-    article_type = session.get(ArticleType, id)
+    article_type = await session.get(ArticleType, id)
     if not article_type:
         raise HTTPException(status_code=404, detail="Article type not found")
+    etag = make_etag(article_type.id, article_type.updated_at)
+    if is_not_modified(request, etag, article_type.updated_at):
+        return not_modified_response(etag, article_type.updated_at)
+    response.headers.update(validator_headers(etag, article_type.updated_at))
     return article_type
 
 
 @router.post("/", response_model=ArticleType)
-def create_article_type(
-    *, session: SessionDep, current_user: CurrentUser, article_in: ArticleTypeCreate
+async def create_article_type(
+    *,
+    session: AsyncSessionDep,
+    current_user: CurrentAuthUser,
+    article_in: ArticleTypeCreate,
 ) -> Any:
     """
     Create new article type.
@@ -52,23 +109,24 @@ def create_article_type(
         raise HTTPException(status_code=400, detail="Not enough permissions")
     article_type = ArticleType.model_validate(article_in)
     session.add(article_type)
-    session.commit()
-    session.refresh(article_type)
+    await session.commit()
+    await response_cache.bump_async("articletype")
+    await session.refresh(article_type)
     return article_type
 
 
 @router.put("/{id}", response_model=ArticleType)
-def update_article_type(
+async def update_article_type(
     *,
-    session: SessionDep,
-    current_user: CurrentUser,
+    session: AsyncSessionDep,
+    current_user: CurrentAuthUser,
     id: uuid.UUID,
     article_in: ArticleTypeUpdate,
 ) -> Any:
     """
     Update an article type.
     """
-    article_type = session.get(ArticleType, id)
+    article_type = await session.get(ArticleType, id)
     if not article_type:
         raise HTTPException(status_code=404, detail="Article type not found")
     if not current_user.is_superuser:
@@ -76,23 +134,27 @@ def update_article_type(
     update_dict = article_in.model_dump(exclude_unset=True)
     article_type.sqlmodel_update(update_dict)
     session.add(article_type)
-    session.commit()
-    session.refresh(article_type)
+    await session.commit()
+    await response_cache.bump_async("articletype")
+    await session.refresh(article_type)
     return article_type
 
 
 @router.delete("/{id}")
-def delete_article_type(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+async def delete_article_type(
+    session: AsyncSessionDep, current_user: CurrentAuthUser, id: uuid.UUID
 ) -> Message:
     """
     Delete an article type.
     """
-    article_type = session.get(ArticleType, id)
+    article_type = await session.get(ArticleType, id)
     if not article_type:
         raise HTTPException(status_code=404, detail="Article type not found")
     if not current_user.is_superuser:
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    session.delete(article_type)
-    session.commit()
+    await session.delete(article_type)
+    await session.commit()
+    # Its articles went with it
+    article_cache.clear()
+    await response_cache.bump_async("articletype", "article")
     return Message(message="Article type deleted successfully")
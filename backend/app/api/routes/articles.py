@@ -1,101 +1,618 @@
+import codecs
+import html
 import uuid
-from typing import Any
+import zlib
+from collections.abc import AsyncIterator, Iterable
+from datetime import datetime
+from typing import Annotated, Any, TypeVar, cast
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import from_json, to_json
+from sqlalchemy import (
+    Delete,
+    Float,
+    Select,
+    Update,
+    delete,
+    insert,
+    literal_column,
+    update,
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlmodel import Session, col, func, select, tuple_
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.deps import CurrentUser, SessionDep
+from app import crud
+from app.api.conditional import (
+    cached_json_response,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+)
+from app.api.deps import (
+    ArticleExpandDep,
+    ArticleFieldsDep,
+    AsyncSessionDep,
+    CurrentAuthUser,
+    get_current_auth_superuser,
+)
+from app.api.responses import projected_json_response
+from app.core.cache import AuthUser, CachedResponse, article_cache, response_cache
+from app.core.config import CountStrategy, settings
+from app.core.db import async_engine, engine
+from app.import_articles import ImportFormat, guess_format, import_articles
 from app.models import (
     Article,
+    ArticleBulkCreate,
+    ArticleBulkError,
     ArticleCreate,
+    ArticleExpandedPublic,
+    ArticleImportReport,
+    ArticleOwnerPublic,
     ArticlePublic,
-    ArticlesPublic,
+    ArticlesBulkPublic,
+    ArticlesExpandedPublic,
+    ArticlesSearchPublic,
     ArticleType,
+    ArticleTypePublic,
     ArticleUpdate,
     Message,
+    User,
+    article_search_vector,
+    get_datetime_utc,
 )
+from app.utils import decode_cursor, encode_cursor
 
 router = APIRouter(prefix="/articles", tags=["articles"])
 
+ArticleCursorKey = TypeAdapter(tuple[datetime, uuid.UUID])
+SearchCursorKey = TypeAdapter(tuple[float, uuid.UUID])
+
+SEARCH_CONFIG = literal_column("'english'::regconfig", REGCONFIG)
+# Matches are marked with control characters and only turned into <mark>
+# tags after the text has been HTML escaped
+HIGHLIGHT_START, HIGHLIGHT_STOP = "\x02", "\x03"
+HIGHLIGHT_OPTIONS = (
+    f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, HighlightAll=true"
+)
+
+
+def article_columns(names: Iterable[str]) -> list[Any]:
+    return [col(getattr(Article, name)) for name in names]
+
+
+# What `expand` embeds: the article column holding the relation's id, the
+# related table and the fields read from it
+EXPANSIONS: dict[str, tuple[str, Any, list[str]]] = {
+    "article_type": (
+        "article_type_id",
+        ArticleType,
+        list(ArticleTypePublic.model_fields),
+    ),
+    "owner": ("owner_id", User, list(ArticleOwnerPublic.model_fields)),
+}
+
+
+async def expand_articles(
+    session: AsyncSession, articles: list[dict[str, Any]], expand: list[str]
+) -> None:
+    """
+    Embed the `expand` relations in `articles`, in place.
+
+    Each relation is read with one IN query over the ids of the whole page,
+    as selectinload would, so the number of queries doesn't grow with it.
+    """
+    for name in expand:
+        key, model, fields = EXPANSIONS[name]
+        # Ids are strings in articles read back from their cached JSON
+        ids = {str(article[key]) for article in articles}
+        if not ids:
+            continue
+        statement = select(*[col(getattr(model, field)) for field in fields])
+        rows = await session.exec(
+            statement.where(col(model.id).in_([uuid.UUID(id) for id in ids]))
+        )
+        related = {str(row.id): row._asdict() for row in rows}
+        for article in articles:
+            article[name] = related.get(str(article[key]))
+
+
+# What lists and exports read instead of whole Article instances
+ARTICLE_PUBLIC_COLUMNS = article_columns(ArticlePublic.model_fields)
+
+BULK_MAX_ARTICLES = 1000
+EXPORT_BATCH_SIZE = 1000
+
+
+WriteStatement = TypeVar("WriteStatement", Update, Delete)
+
 
-@router.get("/", response_model=ArticlesPublic)
-def read_articles(
-    session: SessionDep, skip: int = 0, limit: int = 100
+def writable_by(statement: WriteStatement, user: AuthUser) -> WriteStatement:
+    """
+    Restrict an UPDATE or DELETE of articles to the ones `user` may change.
+    """
+    if user.is_superuser:
+        return statement
+    return statement.where(col(Article.owner_id) == user.id)
+
+
+async def write_refused(
+    session: AsyncSession, id: uuid.UUID, not_found: str
+) -> HTTPException:
+    """
+    Error for a write that matched no row, the article is either missing or
+    someone else's. Only this failure path pays for the extra lookup.
+    """
+    found = (await session.exec(select(Article.id).where(Article.id == id))).first()
+    if found is None:
+        return HTTPException(status_code=404, detail=not_found)
+    return HTTPException(status_code=400, detail="Not enough permissions")
+
+
+def parse_article_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    values = decode_cursor(cursor)
+    try:
+        return ArticleCursorKey.validate_python(values)
+    except ValidationError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_search_cursor(cursor: str) -> tuple[float, uuid.UUID]:
+    values = decode_cursor(cursor)
+    try:
+        return SearchCursorKey.validate_python(values)
+    except ValidationError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def render_highlight(headline: str) -> str:
+    return (
+        html.escape(headline)
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_STOP, "</mark>")
+    )
+
+
+@router.get("/", response_model=ArticlesExpandedPublic)
+async def read_articles(
+    session: AsyncSessionDep,
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    count_strategy: CountStrategy | None = None,
+    article_type_id: uuid.UUID | None = None,
+    owner_id: uuid.UUID | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    fields: ArticleFieldsDep = None,
+    expand: ArticleExpandDep = None,
 ) -> Any:
     """
-    Retrieve artilces.
+    Retrieve artilces, newest first.
+
+    Pass the `next_cursor` of a page as `cursor` to fetch the following page,
+    `skip` is ignored then. Filters can be combined, `created_after` is
+    inclusive and `created_before` exclusive. `fields` narrows the articles
+    to the listed fields, `expand` embeds their type or owner.
     """
-    count_statement = select(func.count()).select_from(Article)
-    count = session.exec(count_statement).one()
-    statement = select(Article).offset(skip).limit(limit)
-    articles = session.exec(statement).all()
-    return ArticlesPublic(data=articles, count=count)
+    expand = expand or []
+    count_strategy = count_strategy or settings.LIST_COUNT_STRATEGY
+    key, cached = await response_cache.lookup_async(
+        "articles",
+        {
+            "skip": skip,
+            "limit": limit,
+            "cursor": cursor,
+            "count_strategy": count_strategy,
+            "article_type_id": article_type_id,
+            "owner_id": owner_id,
+            "created_after": created_after,
+            "created_before": created_before,
+            "fields": ",".join(fields) if fields else None,
+            "expand": ",".join(expand) or None,
+        },
+        tables=[
+            "article",
+            *(["articletype"] if "article_type" in expand else []),
+            *(["user"] if "owner" in expand else []),
+        ],
+    )
+    if cached is not None:
+        return cached_json_response(request, cached)
+    names = fields or list(ArticlePublic.model_fields)
+    # The cursor is made from the last article's key and relations are
+    # embedded by their id, requested or not
+    keys = [EXPANSIONS[name][0] for name in expand]
+    selected = list(dict.fromkeys([*names, "created_at", "id", *keys]))
+    statement = select(*article_columns(selected))
+    if article_type_id is not None:
+        statement = statement.where(Article.article_type_id == article_type_id)
+    if owner_id is not None:
+        statement = statement.where(Article.owner_id == owner_id)
+    if created_after is not None:
+        statement = statement.where(Article.created_at >= created_after)
+    if created_before is not None:
+        statement = statement.where(Article.created_at < created_before)
+    after = None
+    if cursor is not None:
+        created_at, article_id = parse_article_cursor(cursor)
+        after = tuple_(Article.created_at, Article.id) < tuple_(created_at, article_id)
+    articles, count = await session.run_sync(
+        lambda sync_session: crud.get_page(
+            session=cast(Session, sync_session),
+            statement=statement,
+            order_by=[col(Article.created_at).desc(), col(Article.id).desc()],
+            limit=limit,
+            skip=skip,
+            after=after,
+            count_strategy=count_strategy,
+        )
+    )
+    next_cursor = None
+    if articles and len(articles) == limit:
+        last = articles[-1]
+        next_cursor = encode_cursor(last["created_at"].isoformat(), last["id"])
+    await expand_articles(session, articles, expand)
+    if len(selected) > len(names):
+        shown = [*names, *expand]
+        articles = [{name: article[name] for name in shown} for article in articles]
+    # Already shaped and typed like ArticlePublic, no need to validate again
+    content = to_json({"data": articles, "count": count, "next_cursor": next_cursor})
+    cached = CachedResponse(content=content, etag=make_etag(content))
+    await response_cache.set_async(key, cached)
+    return cached_json_response(request, cached)
 
 
-@router.get("/{id}", response_model=ArticlePublic)
-def read_article(session: SessionDep, id: uuid.UUID) -> Any:
+@router.get("/search", response_model=ArticlesSearchPublic)
+async def search_articles(
+    session: AsyncSessionDep,
+    q: Annotated[str, Query(min_length=1, max_length=255)],
+    limit: int = 20,
+    cursor: str | None = None,
+) -> Any:
     """
-    Get article by ID.
+    Full-text search over article titles and descriptions, best match first.
+
+    `q` uses web search syntax: quoted phrases, `or` and `-` to exclude a
+    word. Pass the `next_cursor` of a page as `cursor` to fetch the next one.
     """
-    article = session.get(Article, id)
-    if not article:
-        raise HTTPException(status_code=404, detail="article not found")
-    return article
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    # A real, widened to the double precision the cursor's float is bound as
+    # so the keyset comparison matches the rank exactly
+    rank = func.ts_rank_cd(article_search_vector, query).cast(Float(53))
+    matches: Select[Any] = select(
+        col(Article.id).label("id"), rank.label("rank")
+    ).where(article_search_vector.bool_op("@@")(query))
+    if cursor is not None:
+        last_rank, last_id = parse_search_cursor(cursor)
+        matches = matches.where(
+            tuple_(rank, Article.id) < tuple_(last_rank, last_id)  # type: ignore[arg-type]
+        )
+    # Rank and cut the page first so headlines are only built for its rows
+    hits = matches.order_by(rank.desc(), col(Article.id).desc()).limit(limit).subquery()
+    columns = [
+        *ARTICLE_PUBLIC_COLUMNS,
+        hits.c.rank,
+        func.ts_headline(SEARCH_CONFIG, Article.title, query, HIGHLIGHT_OPTIONS).label(
+            "title_highlight"
+        ),
+        func.ts_headline(
+            SEARCH_CONFIG, Article.description, query, HIGHLIGHT_OPTIONS
+        ).label("description_highlight"),
+    ]
+    statement = (
+        select(*columns)
+        .join(hits, hits.c.id == Article.id)
+        .order_by(hits.c.rank.desc(), hits.c.id.desc())
+    )
+    # Read in ArticleSearchPublic's shape and types, dumped without building it
+    results = [row._asdict() for row in (await session.exec(statement)).all()]
+    for result in results:
+        result["title_highlight"] = render_highlight(result["title_highlight"])
+        description = result["description_highlight"]
+        result["description_highlight"] = description and render_highlight(description)
+    next_cursor = None
+    if results and len(results) == limit:
+        last = results[-1]
+        next_cursor = encode_cursor(last["rank"], last["id"])
+    return projected_json_response({"data": results, "next_cursor": next_cursor})
+
+
+async def export_articles_ndjson(compress: bool) -> AsyncIterator[bytes]:
+    """
+    Every article as one JSON line, read through a server-side cursor.
+
+    The transaction is REPEATABLE READ so the export is one consistent
+    snapshot, and only EXPORT_BATCH_SIZE rows are held at a time.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+    async with async_engine.connect() as connection:
+        await connection.execution_options(
+            isolation_level="REPEATABLE READ", postgresql_readonly=True
+        )
+        result = await connection.stream(
+            select(*ARTICLE_PUBLIC_COLUMNS).execution_options(
+                yield_per=EXPORT_BATCH_SIZE
+            )
+        )
+        async for rows in result.partitions():
+            # The columns are ArticlePublic's, dumped without building one
+            chunk = b"".join(to_json(row._asdict()) + b"\n" for row in rows)
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+    if compressor:
+        yield compressor.flush()
+
+
+@router.get(
+    "/export",
+    dependencies=[Depends(get_current_auth_superuser)],
+    response_class=StreamingResponse,
+)
+async def export_articles(gzip: bool = False) -> StreamingResponse:
+    """
+    Export all articles as newline delimited JSON, gzipped if asked to.
+
+    The body is streamed, so memory use doesn't grow with the table.
+    """
+    filename = "articles.ndjson.gz" if gzip else "articles.ndjson"
+    return StreamingResponse(
+        export_articles_ndjson(compress=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def read_article_view(
+    session: AsyncSession,
+    id: uuid.UUID,
+    fields: list[str] | None,
+    expand: list[str],
+    cached: CachedResponse | None,
+) -> CachedResponse:
+    """
+    The `fields` of an article with its `expand` relations embedded.
+
+    The article is cut out of its cached representation if it has one,
+    otherwise only the columns needed are read.
+    """
+    names = fields or list(ArticlePublic.model_fields)
+    if cached is not None:
+        values = from_json(cached.content)
+        last_modified = cached.last_modified
+    else:
+        keys = [EXPANSIONS[name][0] for name in expand]
+        columns = article_columns(dict.fromkeys([*names, "updated_at", *keys]))
+        row = (await session.exec(select(*columns).where(Article.id == id))).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="article not found")
+        values = row._asdict()
+        last_modified = values["updated_at"]
+    article = {name: values[name] for name in names}
+    if not expand:
+        return CachedResponse(
+            content=to_json(article),
+            etag=make_etag(id, last_modified, fields),
+            last_modified=last_modified,
+        )
+    await expand_articles(session, [values], expand)
+    article.update((name, values[name]) for name in expand)
+    content = to_json(article)
+    # Embedded relations change without the article's updated_at, only a
+    # tag made from the content notices
+    return CachedResponse(content=content, etag=make_etag(content))
+
+
+@router.get("/{id}", response_model=ArticleExpandedPublic)
+async def read_article(
+    session: AsyncSessionDep,
+    request: Request,
+    id: uuid.UUID,
+    fields: ArticleFieldsDep = None,
+    expand: ArticleExpandDep = None,
+) -> Any:
+    """
+    Get article by ID, or only some of its `fields`, `expand` embeds its
+    type or owner.
+
+    Supports conditional requests with If-None-Match and If-Modified-Since.
+    """
+    cached = article_cache.get(id)
+    if fields is not None or expand is not None:
+        view = await read_article_view(session, id, fields, expand or [], cached)
+        return cached_json_response(request, view)
+    if cached is None:
+        # A plain row, the validators are checked before anything is built
+        statement = select(*ARTICLE_PUBLIC_COLUMNS).where(Article.id == id)
+        row = (await session.exec(statement)).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="article not found")
+        etag = make_etag(id, row.updated_at)
+        if is_not_modified(request, etag, row.updated_at):
+            return not_modified_response(etag, row.updated_at)
+        cached = CachedResponse(
+            # Already shaped and typed like ArticlePublic
+            content=to_json(row._asdict()),
+            etag=etag,
+            last_modified=row.updated_at,
+        )
+        article_cache.set(id, cached)
+    return cached_json_response(request, cached)
 
 
 @router.post("/", response_model=ArticlePublic)
-def create_article(
-    session: SessionDep, current_user: CurrentUser, article_in: ArticleCreate, article_type_id: uuid.UUID
+async def create_article(
+    session: AsyncSessionDep,
+    current_user: CurrentAuthUser,
+    article_in: ArticleCreate,
+    article_type_id: uuid.UUID,
 ) -> Any:
     """
     Create new article.
     """
-    article_type = session.get(ArticleType, article_type_id)
+    article_type = await session.get(ArticleType, article_type_id)
     if not article_type:
         raise HTTPException(status_code=404, detail="Article type not found")
-    article = Article.model_validate(article_in, update={"owner_id": current_user.id, "article_type_id": article_type_id})
+    article = Article.model_validate(
+        article_in,
+        update={"owner_id": current_user.id, "article_type_id": article_type_id},
+    )
     session.add(article)
-    session.commit()
-    session.refresh(article)
+    await session.commit()
+    await response_cache.bump_async("article")
+    await session.refresh(article)
     return article
 
 
+@router.post(
+    "/bulk",
+    response_model=ArticlesBulkPublic,
+    # The items are validated one by one to report each error by its index,
+    # their schema is published all the same
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {
+                    "schema": {"items": ArticleBulkCreate.model_json_schema()}
+                }
+            }
+        }
+    },
+)
+async def create_articles(
+    session: AsyncSessionDep,
+    current_user: CurrentAuthUser,
+    articles_in: Annotated[list[Any], Body(max_length=BULK_MAX_ARTICLES)],
+) -> Any:
+    """
+    Create many articles at once.
+
+    Each item is an article plus its `article_type_id`. Invalid items and
+    unknown article types are reported in `errors` by their index, the other
+    items are still created in a single statement.
+    """
+    errors: list[ArticleBulkError] = []
+    valid: list[tuple[int, ArticleBulkCreate]] = []
+    for index, item in enumerate(articles_in):
+        try:
+            valid.append((index, ArticleBulkCreate.model_validate(item)))
+        except ValidationError as e:
+            detail = e.errors(include_url=False, include_context=False)
+            errors.append(ArticleBulkError(index=index, detail=list(detail)))
+    type_ids = {article_in.article_type_id for _, article_in in valid}
+    known_type_ids: set[uuid.UUID] = set()
+    if type_ids:
+        known_type_ids = set(
+            (
+                await session.exec(
+                    select(ArticleType.id).where(col(ArticleType.id).in_(type_ids))
+                )
+            ).all()
+        )
+    rows = []
+    for index, article_in in valid:
+        if article_in.article_type_id not in known_type_ids:
+            errors.append(
+                ArticleBulkError(index=index, detail="Article type not found")
+            )
+            continue
+        article = Article.model_validate(
+            article_in, update={"owner_id": current_user.id}
+        )
+        rows.append(article.model_dump())
+    articles: list[ArticlePublic] = []
+    if rows:
+        statement = insert(Article).values(rows).returning(Article)
+        # Serialize before the commit expires the returned rows
+        result = await session.exec(statement)  # type: ignore
+        articles = [
+            ArticlePublic.model_validate(article) for article in result.scalars()
+        ]
+        await session.commit()
+        await response_cache.bump_async("article")
+    errors.sort(key=lambda error: error.index)
+    return ArticlesBulkPublic(data=articles, errors=errors)
+
+
+@router.post(
+    "/import",
+    dependencies=[Depends(get_current_auth_superuser)],
+    response_model=ArticleImportReport,
+)
+def import_articles_file(
+    current_user: CurrentAuthUser, file: UploadFile, format: ImportFormat | None = None
+) -> Any:
+    """
+    Import articles from an NDJSON or CSV file, see app/import_articles.py.
+
+    The format is guessed from the file name unless given. Rejected rows are
+    counted and the first ones are listed by line number.
+    """
+    # Decoded line by line, the spooled upload isn't a full io object before
+    # Python 3.11 and can't be wrapped in a TextIOWrapper
+    stream = codecs.iterdecode(file.file, "utf-8")
+    with engine.connect() as connection:
+        return import_articles(
+            connection=connection,
+            stream=stream,
+            format=format or guess_format(file.filename),
+            owner_id=current_user.id,
+        )
+
+
 @router.put("/{id}", response_model=ArticlePublic)
-def update_article(
+async def update_article(
     *,
-    session: SessionDep,
-    current_user: CurrentUser,
+    session: AsyncSessionDep,
+    current_user: CurrentAuthUser,
     id: uuid.UUID,
     article_in: ArticleUpdate,
 ) -> Any:
     """
     Update an article.
     """
-    article = session.get(Article, id)
-    if not article:
-        raise HTTPException(status_code=404, detail="article not found")
-    if not current_user.is_superuser and (article.owner_id != current_user.id):
-        raise HTTPException(status_code=400, detail="Not enough permissions")
     update_dict = article_in.model_dump(exclude_unset=True)
-    article.sqlmodel_update(update_dict)
-    session.add(article)
-    session.commit()
-    session.refresh(article)
-    return article
+    statement = writable_by(
+        update(Article).where(col(Article.id) == id), current_user
+    ).values(**update_dict, updated_at=get_datetime_utc())
+    result = await session.exec(statement.returning(Article))  # type: ignore
+    article = result.scalars().first()
+    if not article:
+        raise await write_refused(session, id, "article not found")
+    # Serialize before the commit expires the returned row
+    article_out = ArticlePublic.model_validate(article)
+    await session.commit()
+    article_cache.delete(id)
+    await response_cache.bump_async("article")
+    return article_out
 
 
 @router.delete("/{id}")
-def delete_article(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+async def delete_article(
+    session: AsyncSessionDep, current_user: CurrentAuthUser, id: uuid.UUID
 ) -> Message:
     """
     Delete an article.
     """
-    article = session.get(Article, id)
-    if not article:
-        raise HTTPException(status_code=404, detail="Article not found")
-    if not current_user.is_superuser and (article.owner_id != current_user.id):
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    session.delete(article)
-    session.commit()
+    statement = writable_by(delete(Article).where(col(Article.id) == id), current_user)
+    result = await session.exec(statement.returning(col(Article.id)))  # type: ignore
+    deleted = result.scalars().first()
+    if not deleted:
+        raise await write_refused(session, id, "Article not found")
+    await session.commit()
+    article_cache.delete(id)
+    await response_cache.bump_async("article")
     return Message(message="Article deleted successfully")
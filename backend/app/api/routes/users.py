@@ -2,18 +2,21 @@ import uuid
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import col, delete, func, select
+from sqlmodel import col, select
 
 from app import crud
 from app.api.deps import (
     CurrentUser,
     SessionDep,
+    UserFieldsDep,
     get_current_active_superuser,
 )
-from app.core.config import settings
+from app.api.responses import projected_json_response
+from app.core.cache import article_cache, response_cache, user_cache
+from app.core.config import CountStrategy, settings
+from app.core.outbox import queue_email
 from app.core.security import get_password_hash, verify_password
 from app.models import (
-    Article,
     Message,
     UpdatePassword,
     User,
@@ -24,7 +27,7 @@ from app.models import (
     UserUpdate,
     UserUpdateMe,
 )
-from app.utils import generate_new_account_email, send_email
+from app.utils import generate_new_account_email
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -34,18 +37,28 @@ router = APIRouter(prefix="/users", tags=["users"])
     dependencies=[Depends(get_current_active_superuser)],
     response_model=UsersPublic,
 )
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+def read_users(
+    session: SessionDep,
+    skip: int = 0,
+    limit: int = 100,
+    count_strategy: CountStrategy | None = None,
+    fields: UserFieldsDep = None,
+) -> Any:
     """
-    Retrieve users.
+    Retrieve users, only their `fields` if given.
     """
+    # Only public columns, never hashed_password
+    names = fields or UserPublic.model_fields
+    users, count = crud.get_page(
+        session=session,
+        statement=select(*[col(getattr(User, name)) for name in names]),
+        order_by=[col(User.id)],
+        limit=limit,
+        skip=skip,
+        count_strategy=count_strategy or settings.LIST_COUNT_STRATEGY,
+    )
 
-    count_statement = select(func.count()).select_from(User)
-    count = session.exec(count_statement).one()
-
-    statement = select(User).offset(skip).limit(limit)
-    users = session.exec(statement).all()
-
-    return UsersPublic(data=users, count=count)
+    return projected_json_response({"data": users, "count": count})
 
 
 @router.post(
@@ -67,7 +80,8 @@ def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
         email_data = generate_new_account_email(
             email_to=user_in.email, username=user_in.email, password=user_in.password
         )
-        send_email(
+        queue_email(
+            session=session,
             email_to=user_in.email,
             subject=email_data.subject,
             html_content=email_data.html_content,
@@ -93,6 +107,8 @@ def update_user_me(
     current_user.sqlmodel_update(user_data)
     session.add(current_user)
     session.commit()
+    user_cache.delete(current_user.id)
+    response_cache.bump("user")
     session.refresh(current_user)
     return current_user
 
@@ -134,10 +150,12 @@ def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
-    statement = delete(Article).where(col(Article.owner_id) == current_user.id)
-    session.exec(statement)  # type: ignore
+    # Their articles go with the user through the foreign key cascade
     session.delete(current_user)
     session.commit()
+    user_cache.delete(current_user.id)
+    article_cache.clear()
+    response_cache.bump("article")
     return Message(message="User deleted successfully")
 
 
@@ -165,7 +183,7 @@ def read_user_by_id(
     Get a specific user by id.
     """
     user = session.get(User, user_id)
-    if user == current_user:
+    if user and user.id == current_user.id:
         return user
     if not current_user.is_superuser:
         raise HTTPException(
@@ -217,12 +235,14 @@ def delete_user(
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    if user == current_user:
+    if user.id == current_user.id:
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
-    statement = delete(Article).where(col(Article.owner_id) == user_id)
-    session.exec(statement)  # type: ignore
+    # Their articles go with the user through the foreign key cascade
     session.delete(user)
     session.commit()
+    user_cache.delete(user_id)
+    article_cache.clear()
+    response_cache.bump("article")
     return Message(message="User deleted successfully")
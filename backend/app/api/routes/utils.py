@@ -1,9 +1,17 @@
+import os
+from typing import Any
+
 from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
 
-from app.api.deps import get_current_active_superuser
+from app.api.deps import SessionDep, get_current_active_superuser
+from app.core.cache import article_cache, response_cache, token_cache, user_cache
+from app.core.compression import compression_stats
+from app.core.db import async_engine, engine, pool_stats
+from app.core.outbox import email_outbox, queue_email
+from app.core.security import password_hasher
 from app.models import Message
-from app.utils import generate_test_email, send_email
+from app.utils import generate_test_email
 
 router = APIRouter(prefix="/utils", tags=["utils"])
 
@@ -13,12 +21,13 @@ router = APIRouter(prefix="/utils", tags=["utils"])
     dependencies=[Depends(get_current_active_superuser)],
     status_code=201,
 )
-def test_email(email_to: EmailStr) -> Message:
+def test_email(session: SessionDep, email_to: EmailStr) -> Message:
     """
     Test emails.
     """
     email_data = generate_test_email(email_to=email_to)
-    send_email(
+    queue_email(
+        session=session,
         email_to=email_to,
         subject=email_data.subject,
         html_content=email_data.html_content,
@@ -29,3 +38,22 @@ def test_email(email_to: EmailStr) -> Message:
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
+
+
+@router.get("/metrics/", dependencies=[Depends(get_current_active_superuser)])
+def read_metrics() -> dict[str, Any]:
+    """
+    Runtime counters of the worker process that served the request.
+    """
+    return {
+        "pid": os.getpid(),
+        "article_cache": article_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "email_outbox": email_outbox.stats(),
+        "db_pool": pool_stats(engine),
+        "db_async_pool": pool_stats(async_engine),
+        "compression": compression_stats.stats(),
+    }
@@ -0,0 +1,60 @@
+import argparse
+import logging
+import time
+
+from passlib.hash import bcrypt
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 20
+
+
+def hash_time(rounds: int, samples: int) -> float:
+    """
+    Best of `samples` hashing times with `rounds`, in seconds.
+    """
+    handler = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        handler.hash("benchmark password")
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def pick_rounds(target: float, samples: int) -> int:
+    """
+    Highest rounds whose hashing time stays within `target` seconds.
+    """
+    # The first hash also loads the bcrypt backend
+    hash_time(MIN_ROUNDS, 1)
+    rounds = MIN_ROUNDS
+    for candidate in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = hash_time(candidate, samples)
+        logger.info("rounds=%d: %.1f ms", candidate, elapsed * 1000)
+        if elapsed > target:
+            break
+        rounds = candidate
+    return rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Pick the bcrypt rounds for a target hashing time"
+    )
+    parser.add_argument(
+        "--target-ms",
+        type=float,
+        default=250,
+        help="longest acceptable time to hash or check one password",
+    )
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+    rounds = pick_rounds(args.target_ms / 1000, args.samples)
+    logger.info("Set BCRYPT_ROUNDS=%d", rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, Protocol, TypeVar
+from urllib.parse import urlencode
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.models import TokenPayload
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """
+    A serialized JSON body together with its validators.
+    """
+
+    content: bytes
+    etag: str
+    last_modified: datetime | None = None
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    """
+    What authorization checks need to know about the current user.
+    """
+
+    id: uuid.UUID
+    is_active: bool
+    is_superuser: bool
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Bounded LRU cache whose entries also expire `ttl` seconds after being set.
+
+    Caches are per process, so entries written by another worker are only
+    seen once they expire here.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class CacheBackend(Protocol):
+    """
+    The subset of the Redis command set the response cache relies on.
+    `blocking` backends wait on the network and are kept off the event loop.
+    """
+
+    blocking: bool
+
+    def get(self, key: str) -> bytes | None: ...
+
+    def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    def incr(self, key: str) -> int: ...
+
+
+class MemoryCacheBackend:
+    """
+    Process local backend, generations are not shared between workers, see
+    get_response_cache.
+    """
+
+    blocking = False
+
+    def __init__(self, *, maxsize: int) -> None:
+        self.values: TTLCache[str, bytes] = TTLCache(maxsize=maxsize, ttl=0)
+        self.counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            if key in self.counters:
+                return str(self.counters[key]).encode()
+        return self.values.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.values.set(key, value, ttl=ttl)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+            return self.counters[key]
+
+
+class RedisCacheBackend:
+    """
+    Backend for Redis or any server speaking its protocol, shared by all
+    workers. Needs the optional `redis` package.
+    """
+
+    blocking = True
+
+    def __init__(self, client: Any) -> None:
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        import redis  # type: ignore[import-not-found,unused-ignore]
+
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key: str) -> bytes | None:
+        value = self.client.get(key)
+        return None if value is None else bytes(value)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.client.set(key, value, px=max(int(ttl * 1000), 1))
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(key))
+
+
+def get_cache_backend(url: str) -> CacheBackend:
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend.from_url(url)
+    if url == "memory://":
+        return MemoryCacheBackend(maxsize=settings.RESPONSE_CACHE_SIZE)
+    raise ValueError(f"Unsupported response cache URL: {url}")
+
+
+class ResponseCache:
+    """
+    Serialized responses keyed by route, parameters and the generation of
+    every table the response was read from.
+
+    Writing to a table bumps its generation, which moves all later lookups
+    to new keys; the orphaned entries simply expire. Async routes use the
+    `_async` methods, which run blocking backends in the threadpool.
+    """
+
+    def __init__(self, backend: CacheBackend, *, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self, table: str) -> int:
+        value = self.backend.get(f"generation:{table}")
+        return 0 if value is None else int(value)
+
+    def bump(self, *tables: str) -> None:
+        for table in tables:
+            self.backend.incr(f"generation:{table}")
+
+    def key(self, route: str, params: Mapping[str, Any], *, tables: list[str]) -> str:
+        generations = ",".join(str(self.generation(table)) for table in tables)
+        query = urlencode(
+            sorted(
+                (name, str(value))
+                for name, value in params.items()
+                if value is not None
+            )
+        )
+        digest = hashlib.blake2b(query.encode(), digest_size=16).hexdigest()
+        return f"response:{route}:{generations}:{digest}"
+
+    def get(self, key: str) -> CachedResponse | None:
+        if self.ttl <= 0:
+            return None
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        etag, last_modified, content = value.split(b"\n", 2)
+        return CachedResponse(
+            content=content,
+            etag=etag.decode(),
+            last_modified=datetime.fromisoformat(last_modified.decode())
+            if last_modified
+            else None,
+        )
+
+    def set(self, key: str, response: CachedResponse) -> None:
+        if self.ttl <= 0:
+            return
+        last_modified = response.last_modified
+        header = (
+            f"{response.etag}\n{last_modified.isoformat() if last_modified else ''}\n"
+        )
+        self.backend.set(key, header.encode() + response.content, self.ttl)
+
+    def lookup(
+        self, route: str, params: Mapping[str, Any], *, tables: list[str]
+    ) -> tuple[str, CachedResponse | None]:
+        """
+        The key of a response and the response cached under it, if any.
+        """
+        key = self.key(route, params, tables=tables)
+        return key, self.get(key)
+
+    async def lookup_async(
+        self, route: str, params: Mapping[str, Any], *, tables: list[str]
+    ) -> tuple[str, CachedResponse | None]:
+        # One trip to the threadpool for the generations and the response
+        return await self._run(lambda: self.lookup(route, params, tables=tables))
+
+    async def set_async(self, key: str, response: CachedResponse) -> None:
+        await self._run(lambda: self.set(key, response))
+
+    async def bump_async(self, *tables: str) -> None:
+        await self._run(lambda: self.bump(*tables))
+
+    async def _run(self, fn: Callable[[], T]) -> T:
+        if self.backend.blocking:
+            return await run_in_threadpool(fn)
+        return fn()
+
+    def stats(self) -> dict[str, int | float]:
+        return {"ttl": self.ttl, "hits": self.hits, "misses": self.misses}
+
+
+def get_response_cache(url: str, *, ttl: float) -> ResponseCache:
+    backend = get_cache_backend(url)
+    if isinstance(backend, MemoryCacheBackend):
+        # Writes only bump this worker's generations, so pages cached by the
+        # other workers stay stale until they expire. Keep them no longer
+        # than the per worker article cache does
+        ttl = min(ttl, settings.ARTICLE_CACHE_TTL_SECONDS)
+    return ResponseCache(backend, ttl=ttl)
+
+
+# Serialized ArticlePublic payloads by article id
+article_cache: TTLCache[uuid.UUID, CachedResponse] = TTLCache(
+    maxsize=settings.ARTICLE_CACHE_SIZE, ttl=settings.ARTICLE_CACHE_TTL_SECONDS
+)
+
+# Authenticated users by id, see app.api.deps.get_current_auth_user
+user_cache: TTLCache[uuid.UUID, AuthUser] = TTLCache(
+    maxsize=settings.AUTH_USER_CACHE_SIZE, ttl=settings.AUTH_USER_CACHE_TTL_SECONDS
+)
+
+# Verified payloads by access token, see app.api.deps.get_token_data
+token_cache: TTLCache[str, TokenPayload] = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
+# List pages shared by all users, see ResponseCache
+response_cache = get_response_cache(
+    settings.RESPONSE_CACHE_URL, ttl=settings.RESPONSE_CACHE_TTL_SECONDS
+)
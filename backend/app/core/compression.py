@@ -0,0 +1,328 @@
+import threading
+import time
+import zlib
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class Compressor(Protocol):
+    """
+    A response's compressor. `compress` returns everything the client needs
+    to decode `data` so far, for streamed bodies, `finish` the end of the
+    stream. A whole body is compressed with a single `finish`.
+    """
+
+    def compress(self, data: bytes) -> bytes: ...
+
+    def finish(self, data: bytes = b"") -> bytes: ...
+
+
+class GzipCompressor:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+# Encodings this process can produce, the server's preferred first, mapped
+# to a factory of compressors taking the level
+COMPRESSORS: dict[str, Callable[[int], Compressor]] = {}
+
+try:
+    import zstandard  # type: ignore[import-not-found,import-untyped,unused-ignore]
+except ImportError:
+    pass
+else:
+
+    class ZstdCompressor:
+        def __init__(self, level: int) -> None:
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+        def compress(self, data: bytes) -> bytes:
+            return b"".join(
+                (
+                    self._compressor.compress(data),
+                    self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+                )
+            )
+
+        def finish(self, data: bytes = b"") -> bytes:
+            return b"".join((self._compressor.compress(data), self._compressor.flush()))
+
+    COMPRESSORS["zstd"] = ZstdCompressor
+
+try:
+    import brotli  # type: ignore[import-not-found,import-untyped,unused-ignore]
+except ImportError:
+    pass
+else:
+
+    class BrotliCompressor:
+        def __init__(self, level: int) -> None:
+            self._compressor = brotli.Compressor(quality=level)
+
+        def compress(self, data: bytes) -> bytes:
+            return b"".join((self._compressor.process(data), self._compressor.flush()))
+
+        def finish(self, data: bytes = b"") -> bytes:
+            return b"".join((self._compressor.process(data), self._compressor.finish()))
+
+    COMPRESSORS["br"] = BrotliCompressor
+
+COMPRESSORS["gzip"] = GzipCompressor
+
+
+def negotiate(accept_encoding: str, available: Iterable[str]) -> str | None:
+    """
+    The encoding of `available` the client weighs highest in its
+    Accept-Encoding, ties going to the earliest. None if it accepts none.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, *params = item.split(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+    best, best_weight = None, 0.0
+    for encoding in available:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class CompressionStats:
+    """
+    Thread-safe counters of compressed responses, by route and encoding.
+    """
+
+    def __init__(self) -> None:
+        self._counters: dict[tuple[str, str], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self, route: str, encoding: str, size: int, compressed: int, cpu: float
+    ) -> None:
+        with self._lock:
+            counters = self._counters.setdefault((route, encoding), [0, 0, 0, 0.0])
+            counters[0] += 1
+            counters[1] += size
+            counters[2] += compressed
+            counters[3] += cpu
+
+    def stats(self) -> dict[str, dict[str, dict[str, Any]]]:
+        with self._lock:
+            counters = {key: list(value) for key, value in self._counters.items()}
+        routes: dict[str, dict[str, dict[str, Any]]] = {}
+        for (route, encoding), (responses, size, compressed, cpu) in sorted(
+            counters.items()
+        ):
+            routes.setdefault(route, {})[encoding] = {
+                "responses": int(responses),
+                "bytes_in": int(size),
+                "bytes_out": int(compressed),
+                "bytes_saved": int(size - compressed),
+                "cpu_seconds": cpu,
+            }
+        return routes
+
+
+compression_stats = CompressionStats()
+
+
+class CompressedStream:
+    """
+    Compresses the body messages of one streamed response, recording its
+    totals once the last one is sent.
+    """
+
+    def __init__(
+        self,
+        route: str,
+        encoding: str,
+        compressor: Compressor,
+        stats: CompressionStats,
+    ) -> None:
+        self.route = route
+        self.encoding = encoding
+        self.compressor = compressor
+        self.stats = stats
+        self.size = 0
+        self.compressed = 0
+        self.cpu = 0.0
+
+    def compress(self, message: Message) -> Message:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        started = time.thread_time()
+        if more_body:
+            compressed = self.compressor.compress(body)
+        else:
+            compressed = self.compressor.finish(body)
+        self.cpu += time.thread_time() - started
+        self.size += len(body)
+        self.compressed += len(compressed)
+        if not more_body:
+            self.stats.record(
+                self.route, self.encoding, self.size, self.compressed, self.cpu
+            )
+        return {**message, "body": compressed}
+
+
+def route_label(scope: Scope) -> str:
+    # Labelled by route template, unmatched paths would be unbounded
+    return getattr(scope.get("route"), "path", "unmatched")
+
+
+def set_encoding(headers: MutableHeaders, encoding: str) -> None:
+    headers["Content-Encoding"] = encoding
+    # The bytes differ from the identity representation's
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """
+    Compresses response bodies with the best encoding the client accepts.
+
+    Only bodies of a media type in `levels` and without a Content-Encoding
+    yet are compressed. Whole bodies must also be at least `minimum_size`
+    bytes long. Streamed responses, whose body comes in several messages,
+    are compressed chunk by chunk, each chunk flushed so the client can
+    decode it as soon as it arrives, and lose their Content-Length.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int,
+        levels: Mapping[str, Mapping[str, int]],
+        stats: CompressionStats = compression_stats,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = levels
+        self.stats = stats
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        start: Message | None = None
+        stream: CompressedStream | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, stream
+            if message["type"] != "http.response.body":
+                if message["type"] == "http.response.start":
+                    start = message
+                else:
+                    await send(message)
+                return
+            if stream is not None:
+                message = stream.compress(message)
+            elif start is not None:
+                if message.get("more_body", False):
+                    stream = self.start_stream(scope, accept_encoding, start)
+                    if stream is not None:
+                        message = stream.compress(message)
+                else:
+                    message = self.compress(scope, accept_encoding, start, message)
+                await send(start)
+                start = None
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+    def choose_encoding(
+        self, accept_encoding: str, start: Message, size: int | None
+    ) -> tuple[str, int] | None:
+        """
+        The encoding and level to compress the response of `start` with,
+        None if it should be sent as is. `size` is the body's length, None
+        while unknown. Vary is added to `start` headers if the response is
+        compressible.
+        """
+        headers = MutableHeaders(scope=start)
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        levels = self.levels.get(media_type)
+        if (
+            levels is None
+            or (size is not None and size < self.minimum_size)
+            or start["status"] == 206
+            or "content-encoding" in headers
+            or "no-transform" in headers.get("cache-control", "")
+        ):
+            return None
+        headers.add_vary_header("Accept-Encoding")
+        encoding = negotiate(
+            accept_encoding, (name for name in COMPRESSORS if name in levels)
+        )
+        if encoding is None:
+            return None
+        return encoding, levels[encoding]
+
+    def compress(
+        self, scope: Scope, accept_encoding: str, start: Message, message: Message
+    ) -> Message:
+        """
+        The whole body `message` compressed if it should be, `start` headers
+        are updated in place.
+        """
+        body = message.get("body", b"")
+        negotiated = self.choose_encoding(accept_encoding, start, len(body))
+        if negotiated is None:
+            return message
+        encoding, level = negotiated
+        started = time.thread_time()
+        compressed = COMPRESSORS[encoding](level).finish(body)
+        cpu = time.thread_time() - started
+        route = route_label(scope)
+        if len(compressed) >= len(body):
+            self.stats.record(route, encoding, len(body), len(body), cpu)
+            return message
+        self.stats.record(route, encoding, len(body), len(compressed), cpu)
+        headers = MutableHeaders(scope=start)
+        set_encoding(headers, encoding)
+        headers["Content-Length"] = str(len(compressed))
+        return {**message, "body": compressed}
+
+    def start_stream(
+        self, scope: Scope, accept_encoding: str, start: Message
+    ) -> CompressedStream | None:
+        """
+        The compressor of a streamed body if it should be compressed, `start`
+        headers are updated in place.
+        """
+        negotiated = self.choose_encoding(accept_encoding, start, None)
+        if negotiated is None:
+            return None
+        encoding, level = negotiated
+        headers = MutableHeaders(scope=start)
+        set_encoding(headers, encoding)
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        return CompressedStream(
+            route_label(scope), encoding, COMPRESSORS[encoding](level), self.stats
+        )
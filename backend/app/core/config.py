@@ -23,6 +23,12 @@ def parse_cors(v: Any) -> list[str] | str:
     raise ValueError(v)
 
 
+# How list endpoints compute their total `count`: exact scans the matching
+# rows, estimated uses the planner row estimate, counter reads the
+# trigger-maintained RowCount table and none skips counting
+CountStrategy = Literal["exact", "estimated", "counter", "none"]
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         # Use top level .env file (one level above ./backend/)
@@ -55,6 +61,23 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = ""
+    # Connection pools of each worker: the sync engine serves the users,
+    # login and utils routes and the email outbox, the async engine the
+    # article and article type routes. Every worker has both, so keep
+    # workers * (both sizes + both overflows) under Postgres's
+    # max_connections, 100 by default. The defaults take 4 * 20 = 80.
+    # A recycle of -1 keeps connections forever; pre-ping tests each one on
+    # checkout
+    POSTGRES_POOL_SIZE: int = 3
+    POSTGRES_MAX_OVERFLOW: int = 2
+    POSTGRES_ASYNC_POOL_SIZE: int = 5
+    POSTGRES_ASYNC_MAX_OVERFLOW: int = 10
+    POSTGRES_POOL_TIMEOUT: float = 30.0
+    POSTGRES_POOL_RECYCLE: int = -1
+    POSTGRES_POOL_PRE_PING: bool = False
+    # Open both pools' pool_size connections at startup instead of on first
+    # use, 8 per worker with the defaults, held even while idle
+    POSTGRES_POOL_WARM: bool = False
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -85,6 +108,57 @@ class Settings(BaseSettings):
         return self
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
+    # Directory keeping compiled email templates across restarts, if any
+    EMAIL_TEMPLATES_BYTECODE_DIR: str | None = None
+    # Outbox worker of each process, see app.core.outbox. Failed sends are
+    # retried with exponential backoff until EMAIL_MAX_ATTEMPTS
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5.0
+    EMAIL_MAX_ATTEMPTS: int = 8
+    EMAIL_RETRY_BASE_SECONDS: float = 30.0
+    EMAIL_RETRY_MAX_SECONDS: float = 3600.0
+
+    # Only "counter" keeps the article and user RowCount triggers installed,
+    # at the cost of serializing concurrent inserts and deletes of each
+    # table on its count's row until they commit
+    LIST_COUNT_STRATEGY: CountStrategy = "exact"
+
+    # Per worker cache of single article reads, 0 disables it
+    ARTICLE_CACHE_SIZE: int = 1024
+    ARTICLE_CACHE_TTL_SECONDS: float = 5.0
+    # Per worker cache of the id and flags of authenticated users. Changes
+    # made through another worker, like a deactivation, apply within the TTL
+    AUTH_USER_CACHE_SIZE: int = 4096
+    AUTH_USER_CACHE_TTL_SECONDS: float = 10.0
+    # bcrypt work factor, each step doubles the hashing time. Stored hashes
+    # with another factor are rehashed on the next login. Pick one with
+    # python app/benchmark_bcrypt.py
+    BCRYPT_ROUNDS: int = 12
+    # Processes hashing and checking passwords, per worker, and how many more
+    # requests may wait for one before being refused with a 503. 0 workers
+    # hashes in the request thread
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_LIMIT: int = 32
+    # Per worker cache of verified access tokens, entries expire with the token
+    TOKEN_CACHE_SIZE: int = 4096
+    # List pages cache, memory:// per worker or a redis:// URL shared by all
+    # of them (needs the redis package), a TTL of 0 disables it. Writes don't
+    # reach the other workers' memory:// caches, so their TTL is capped at
+    # ARTICLE_CACHE_TTL_SECONDS
+    RESPONSE_CACHE_URL: str = "memory://"
+    RESPONSE_CACHE_SIZE: int = 1024
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0
+    # Response compression negotiated from Accept-Encoding, see
+    # app.core.compression. Only the media types listed are compressed, at
+    # the level given per encoding. br needs the brotli package and zstd the
+    # zstandard one
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_LEVELS: dict[str, dict[str, int]] = {
+        "application/json": {"zstd": 3, "br": 4, "gzip": 6},
+        "application/x-ndjson": {"zstd": 3, "br": 4, "gzip": 6},
+        "text/html": {"zstd": 3, "br": 5, "gzip": 6},
+        "text/plain": {"zstd": 3, "br": 5, "gzip": 6},
+    }
 
     @computed_field  # type: ignore[prop-decorator]
     @property
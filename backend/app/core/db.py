@@ -1,10 +1,97 @@
+import time
+from typing import Any
+
+from sqlalchemy import Engine, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
 from sqlmodel import Session, create_engine, select
 
 from app import crud
-from app.core.config import settings
+from app.core.config import CountStrategy, settings
+from app.core.metrics import Histogram
 from app.models import User, UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool recording how long each checkout waited for a connection.
+    """
+
+    # Class level so the histogram survives Pool.recreate() on dispose
+    wait_time = Histogram()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_time.observe(time.perf_counter() - start)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool recording how long each checkout waited.
+    """
+
+    wait_time = Histogram()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_time.observe(time.perf_counter() - start)
+
+
+# Shared by both engines, which are sized separately
+pool_options: dict[str, Any] = {
+    "pool_timeout": settings.POSTGRES_POOL_TIMEOUT,
+    "pool_recycle": settings.POSTGRES_POOL_RECYCLE,
+    "pool_pre_ping": settings.POSTGRES_POOL_PRE_PING,
+}
+
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.POSTGRES_POOL_SIZE,
+    max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+    **pool_options,
+)
+# Same database through psycopg's asyncio driver, for async route handlers
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=settings.POSTGRES_ASYNC_POOL_SIZE,
+    max_overflow=settings.POSTGRES_ASYNC_MAX_OVERFLOW,
+    **pool_options,
+)
+
+
+def warm_pool(engine: Engine) -> None:
+    """
+    Open pool_size connections up front so the first requests don't pay for it.
+    """
+    connections = [engine.connect() for _ in range(engine.pool.size())]  # type: ignore[attr-defined]
+    for connection in connections:
+        connection.close()
+
+
+async def warm_async_pool(engine: AsyncEngine) -> None:
+    connections = [await engine.connect() for _ in range(engine.pool.size())]  # type: ignore[attr-defined]
+    for connection in connections:
+        await connection.close()
+
+
+def pool_stats(engine: Engine | AsyncEngine) -> dict[str, Any]:
+    pool = engine.pool
+    assert isinstance(pool, InstrumentedQueuePool | InstrumentedAsyncQueuePool)
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "wait_seconds": pool.wait_time.stats(),
+    }
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -31,3 +118,89 @@ def init_db(session: Session) -> None:
             is_superuser=True,
         )
         user = crud.create_user(session=session, user_create=user_in)
+
+    init_row_counters(session)
+
+
+# Tables whose total row count is served from RowCount for the "counter"
+# count strategy
+COUNTED_TABLES = ["article", "articletype", "user"]
+# Counted whatever the strategy, the article types list's ETag reads it
+ALWAYS_COUNTED_TABLES = ["articletype"]
+
+ROW_COUNTER_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION rowcount_on_insert() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE rowcount SET count = count + (SELECT count(*) FROM new_rows)
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION rowcount_on_delete() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE rowcount SET count = count - (SELECT count(*) FROM old_rows)
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION rowcount_on_truncate() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE rowcount SET count = 0 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END $$;
+"""
+
+
+def init_row_counters(
+    session: Session, count_strategy: CountStrategy | None = None
+) -> None:
+    """
+    Install the statement level triggers that keep RowCount in sync.
+
+    Every insert or delete on a counted table updates its single RowCount
+    row, so concurrent writers queue on that row lock until they commit.
+    Unless `count_strategy`, LIST_COUNT_STRATEGY by default, is "counter"
+    only ALWAYS_COUNTED_TABLES are counted; the others have their triggers
+    and counts dropped and lists of them fall back to the planner estimate.
+
+    Creating a trigger locks out writers on the table until commit, so the
+    seeded count can't miss concurrent inserts or deletes.
+    """
+    count_strategy = count_strategy or settings.LIST_COUNT_STRATEGY
+    connection = session.connection()
+    connection.exec_driver_sql(ROW_COUNTER_FUNCTIONS)
+    for table_name in COUNTED_TABLES:
+        name = f'"{table_name}"'
+        counted = count_strategy == "counter" or table_name in ALWAYS_COUNTED_TABLES
+        for event in ("insert", "delete", "truncate"):
+            trigger = f"{table_name}_rowcount_{event}"
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger} ON {name}")
+        if not counted:
+            connection.execute(
+                text("DELETE FROM rowcount WHERE table_name = :table_name"),
+                {"table_name": table_name},
+            )
+            continue
+        for event, transition in (("insert", "NEW"), ("delete", "OLD")):
+            trigger = f"{table_name}_rowcount_{event}"
+            connection.exec_driver_sql(
+                f"CREATE TRIGGER {trigger} AFTER {event.upper()} ON {name} "
+                f"REFERENCING {transition} TABLE AS {transition.lower()}_rows "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION rowcount_on_{event}()"
+            )
+        connection.exec_driver_sql(
+            f"CREATE TRIGGER {table_name}_rowcount_truncate AFTER TRUNCATE ON {name} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION rowcount_on_truncate()"
+        )
+        connection.execute(
+            text(
+                "INSERT INTO rowcount (table_name, count) "
+                f"SELECT :table_name, count(*) FROM {name} "
+                "ON CONFLICT (table_name) DO NOTHING"
+            ),
+            {"table_name": table_name},
+        )
+    session.commit()
@@ -0,0 +1,42 @@
+import bisect
+import threading
+from collections.abc import Sequence
+from typing import Any
+
+# Upper bounds in seconds, suited to waits that are usually near zero
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    """
+    Thread-safe histogram of observed durations in fixed buckets.
+
+    Counters are per process, like the caches, so each worker reports its own.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._max = max(self._max, value)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            total, maximum = self._sum, self._max
+        # Cumulative counts keyed by upper bound, as Prometheus does
+        cumulative: dict[str, int] = {}
+        running = 0
+        bounds = [*map(str, self.buckets), "+Inf"]
+        for bound, count in zip(bounds, counts, strict=True):
+            running += count
+            cumulative[bound] = running
+        return {"count": running, "sum": total, "max": maximum, "buckets": cumulative}
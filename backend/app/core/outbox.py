@@ -0,0 +1,155 @@
+import logging
+import threading
+from datetime import timedelta
+from typing import Any
+
+from emails.backend import SMTPBackend  # type: ignore
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models import EmailOutbox, get_datetime_utc
+from app.utils import get_smtp_options, send_email
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    seconds = settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.EMAIL_RETRY_MAX_SECONDS))
+
+
+class EmailOutboxWorker:
+    """
+    Background thread delivering the EmailOutbox rows that are due.
+
+    The SMTP connection is kept open while there is mail to send and closed
+    once the outbox is drained. Rows are claimed with SKIP LOCKED, so every
+    worker process can run its own thread.
+    """
+
+    def __init__(self, *, batch_size: int, poll_interval: float) -> None:
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self._smtp: Any = None
+        self._thread: threading.Thread | None = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="email-outbox", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                claimed = self.process_batch()
+            except Exception:
+                logger.exception("Email outbox batch failed")
+                claimed = 0
+            if claimed < self.batch_size:
+                self.close_smtp()
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+        self.close_smtp()
+
+    def process_batch(self) -> int:
+        """
+        Try to send the next batch of due emails, returns how many were claimed.
+        """
+        with Session(engine) as session:
+            statement = (
+                select(EmailOutbox)
+                .where(col(EmailOutbox.next_attempt_at) <= get_datetime_utc())
+                .order_by(col(EmailOutbox.next_attempt_at))
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            outbox = session.exec(statement).all()
+            for email in outbox:
+                self.deliver(email)
+                session.add(email)
+            session.commit()
+        return len(outbox)
+
+    def deliver(self, email: EmailOutbox) -> None:
+        email.attempts += 1
+        error: Any = None
+        if not settings.emails_enabled:
+            error = "Emails are not configured"
+        else:
+            if self._smtp is None:
+                self._smtp = SMTPBackend(**get_smtp_options())
+            try:
+                response = send_email(
+                    email_to=email.email_to,
+                    subject=email.subject,
+                    html_content=email.html_content,
+                    smtp=self._smtp,
+                )
+                if not response.success:
+                    error = response.error or response.status_text
+            except Exception as e:
+                error = e
+        if error is None:
+            email.sent_at = get_datetime_utc()
+            email.next_attempt_at = None
+            email.last_error = None
+            self.sent += 1
+            return
+        # Don't reuse a connection that may be broken
+        self.close_smtp()
+        email.last_error = str(error)
+        if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+            logger.error("Giving up on email %s: %s", email.id, error)
+            email.next_attempt_at = None
+            self.failed += 1
+        else:
+            email.next_attempt_at = get_datetime_utc() + retry_delay(email.attempts)
+            self.retried += 1
+
+    def close_smtp(self) -> None:
+        if self._smtp is not None:
+            self._smtp.close()
+            self._smtp = None
+
+    def stats(self) -> dict[str, int]:
+        return {"sent": self.sent, "retried": self.retried, "failed": self.failed}
+
+
+email_outbox = EmailOutboxWorker(
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    poll_interval=settings.EMAIL_OUTBOX_POLL_SECONDS,
+)
+
+
+def queue_email(
+    *, session: Session, email_to: str, subject: str, html_content: str
+) -> None:
+    """
+    Store an email for the outbox worker, the caller only pays for the INSERT.
+    """
+    assert settings.emails_enabled, "no provided configuration for email variables"
+    session.add(
+        EmailOutbox(email_to=email_to, subject=subject, html_content=html_content)
+    )
+    session.commit()
+    email_outbox.wake()
@@ -1,16 +1,153 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, TypeVar
 
 import jwt
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
+from app.core.metrics import Histogram
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with other rounds need an update, see verify_and_update_password
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 
 ALGORITHM = "HS256"
 
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Too many password operations are already waiting for a hashing process.
+    """
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a small process pool, so a burst of logins can't hold the
+    request threads of a worker. `run_async` awaits the result without
+    holding any thread, `run` blocks its caller. Past `queue_limit` waiting
+    calls new ones fail with PasswordHasherBusy. If a hashing process dies,
+    the calls it breaks fail and the next ones get a new pool.
+    """
+
+    def __init__(self, *, workers: int, queue_limit: int) -> None:
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.duration = Histogram()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.rejected = 0
+        self.restarts = 0
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.workers <= 0:
+            start = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.duration.observe(time.perf_counter() - start)
+        return self._submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.workers <= 0:
+            return await run_in_threadpool(self.run, fn, *args)
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def _submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        with self._lock:
+            if self.in_flight >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        start = time.perf_counter()
+
+        def done(future: "Future[T]") -> None:
+            self.duration.observe(time.perf_counter() - start)
+            with self._lock:
+                self.in_flight -= 1
+            # A hashing process died, the whole pool is unusable from now on
+            if not future.cancelled() and isinstance(
+                future.exception(), BrokenProcessPool
+            ):
+                self._discard(executor)
+
+        try:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(fn, *args)
+            except BrokenProcessPool:
+                # Broken since the last call, start over with a new pool
+                self._discard(executor)
+                executor = self._get_executor()
+                future = executor.submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self.in_flight -= 1
+            raise
+        future.add_done_callback(done)
+        return future
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned, forking a process running threads isn't safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            # Unless another call already replaced it
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self.restarts += 1
+        executor.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "rejected": self.rejected,
+                "restarts": self.restarts,
+                "duration_seconds": self.duration.stats(),
+            }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+)
+
 
 def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
@@ -19,9 +156,44 @@ def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
     return encoded_jwt
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+# Run in the hashing processes, which import this module on their own
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
+def _verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return password_hasher.run(_verify_password, plain_password, hashed_password)
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    Check a password, also returning a new hash when the stored one doesn't
+    use the configured scheme and rounds anymore.
+    """
+    return password_hasher.run(
+        _verify_and_update_password, plain_password, hashed_password
+    )
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return await password_hasher.run_async(
+        _verify_and_update_password, plain_password, hashed_password
+    )
+
+
+def get_password_hash(password: str) -> str:
+    return password_hasher.run(_get_password_hash, password)
@@ -1,10 +1,26 @@
 import uuid
+from collections.abc import Sequence
 from typing import Any
 
-from sqlmodel import Session, select
+from sqlalchemy import Select, Table
+from sqlmodel import Session, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
-from app.models import Article, ArticleCreate, User, UserCreate, UserUpdate
+from app.core.cache import response_cache, user_cache
+from app.core.config import CountStrategy
+from app.core.security import (
+    get_password_hash,
+    verify_and_update_password,
+    verify_and_update_password_async,
+)
+from app.models import (
+    Article,
+    ArticleCreate,
+    RowCount,
+    User,
+    UserCreate,
+    UserUpdate,
+)
 
 
 def create_user(*, session: Session, user_create: UserCreate) -> User:
@@ -27,6 +43,9 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
     session.commit()
+    user_cache.delete(db_user.id)
+    # Owners embedded in cached article lists
+    response_cache.bump("user")
     session.refresh(db_user)
     return db_user
 
@@ -41,14 +60,136 @@ def authenticate(*, session: Session, email: str, password: str) -> User | None:
     db_user = get_user_by_email(session=session, email=email)
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    verified, new_hash = verify_and_update_password(password, db_user.hashed_password)
+    if not verified:
         return None
+    if new_hash:
+        # Moves the hash to the current BCRYPT_ROUNDS
+        db_user.hashed_password = new_hash
+        session.add(db_user)
+        session.commit()
+        session.refresh(db_user)
     return db_user
 
 
-def create_item(*, session: Session, item_in: ArticleCreate, owner_id: uuid.UUID) -> Article:
-    db_item = Article.model_validate(item_in, update={"owner_id": owner_id})
+async def authenticate_async(
+    *, session: AsyncSession, email: str, password: str
+) -> User | None:
+    """
+    authenticate for async routes, no thread waits for the password check.
+    """
+    statement = select(User).where(User.email == email)
+    db_user = (await session.exec(statement)).first()
+    if not db_user:
+        return None
+    verified, new_hash = await verify_and_update_password_async(
+        password, db_user.hashed_password
+    )
+    if not verified:
+        return None
+    if new_hash:
+        db_user.hashed_password = new_hash
+        session.add(db_user)
+        await session.commit()
+        await session.refresh(db_user)
+    return db_user
+
+
+def create_item(
+    *,
+    session: Session,
+    item_in: ArticleCreate,
+    owner_id: uuid.UUID,
+    article_type_id: uuid.UUID,
+) -> Article:
+    db_item = Article.model_validate(
+        item_in, update={"owner_id": owner_id, "article_type_id": article_type_id}
+    )
     session.add(db_item)
     session.commit()
     session.refresh(db_item)
     return db_item
+
+
+def count_rows(
+    *, session: Session, statement: Select[Any], strategy: CountStrategy
+) -> int | None:
+    """
+    Total number of rows matched by `statement` according to `strategy`.
+
+    The counter strategy can only answer for a whole table, filtered
+    statements fall back to the planner estimate.
+    """
+    if strategy == "none":
+        return None
+    if strategy == "exact":
+        count_statement = select(func.count()).select_from(
+            statement.order_by(None).subquery()
+        )
+        return session.exec(count_statement).one()
+    froms = statement.get_final_froms()
+    if (
+        strategy == "counter"
+        and statement.whereclause is None
+        and len(froms) == 1
+        and isinstance(froms[0], Table)
+    ):
+        counter = session.get(RowCount, froms[0].name)
+        if counter:
+            return max(counter.count, 0)
+    compiled = statement.compile(dialect=session.get_bind().dialect)
+    plan = (
+        session.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+        .scalar_one()
+    )
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def get_page(
+    *,
+    session: Session,
+    statement: Select[Any],
+    order_by: Sequence[Any],
+    limit: int,
+    skip: int = 0,
+    after: Any | None = None,
+    count_strategy: CountStrategy,
+) -> tuple[list[Any], int | None]:
+    """
+    Fetch one page of `statement` and its total count.
+
+    Keyset pages continue `after` the given criterion, offset pages skip
+    `skip` rows. An exact count on an offset page is read in the same round
+    trip as the page with a window function.
+
+    A statement selecting an entity returns its instances, one selecting
+    columns returns a dict per row, keyed by column name.
+    """
+    columns = statement.column_descriptions
+    names = [column["name"] for column in columns]
+
+    def values(rows: Sequence[Any]) -> list[Any]:
+        if len(columns) == 1 and columns[0]["expr"] is columns[0]["entity"]:
+            return [row[0] for row in rows]
+        # zip() drops the window count when there is one
+        return [dict(zip(names, row, strict=False)) for row in rows]
+
+    page = statement.order_by(*order_by).limit(limit)
+    if after is not None:
+        page = page.where(after)
+    else:
+        page = page.offset(skip)
+    if count_strategy == "exact" and after is None:
+        rows = session.execute(page.add_columns(func.count().over())).all()
+        if rows:
+            return values(rows), rows[0][-1]
+        if skip == 0:
+            return [], 0
+        # Past the last row, the window has nothing to count
+        return [], count_rows(
+            session=session, statement=statement, strategy=count_strategy
+        )
+    data = values(session.execute(page).all())
+    count = count_rows(session=session, statement=statement, strategy=count_strategy)
+    return data, count
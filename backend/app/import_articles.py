@@ -0,0 +1,234 @@
+import argparse
+import csv
+import json
+import logging
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any, Literal
+
+from pydantic import ValidationError
+from sqlalchemy import Connection, text
+from sqlmodel import Session
+
+from app import crud
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.db import engine
+from app.models import ArticleImport, ArticleImportRejection, ArticleImportReport
+
+logger = logging.getLogger(__name__)
+
+ImportFormat = Literal["ndjson", "csv"]
+
+IMPORT_CHUNK_SIZE = 5000
+MAX_REPORTED_REJECTIONS = 100
+
+STAGING_COLUMNS = [
+    "line",
+    "id",
+    "title",
+    "description",
+    "article_type_id",
+    "created_at",
+]
+
+# Per connection, emptied by every commit so it can be reused chunk after chunk
+CREATE_STAGING_TABLE = """
+CREATE TEMPORARY TABLE IF NOT EXISTS article_import (
+    line integer NOT NULL,
+    id uuid NOT NULL,
+    title varchar(255) NOT NULL,
+    description varchar(255),
+    article_type_id uuid NOT NULL,
+    created_at timestamptz NOT NULL
+) ON COMMIT DELETE ROWS
+"""
+
+# Rows whose id already exists are left alone, so a failed import can be rerun
+MERGE_STAGING_TABLE = """
+WITH merged AS (
+    INSERT INTO article
+        (id, title, description, article_type_id, owner_id, created_at, updated_at)
+    SELECT s.id, s.title, s.description, s.article_type_id, :owner_id,
+        s.created_at, now()
+    FROM article_import s
+    JOIN articletype t ON t.id = s.article_type_id
+    ON CONFLICT (id) DO NOTHING
+    RETURNING 1
+)
+SELECT count(*) FROM merged
+"""
+
+UNKNOWN_ARTICLE_TYPES = """
+SELECT s.line FROM article_import s
+WHERE NOT EXISTS (SELECT 1 FROM articletype t WHERE t.id = s.article_type_id)
+ORDER BY s.line
+"""
+
+
+def guess_format(filename: str | None) -> ImportFormat:
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+
+def read_records(
+    stream: Iterable[str], format: ImportFormat
+) -> Iterator[tuple[int, Any]]:
+    """
+    Yield (line number, record) pairs, the record is None for unparsable lines.
+
+    `stream` is any iterable of lines that keep their line endings, like a
+    text file opened with newline="".
+    """
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            # Empty cells stand for missing values
+            yield (
+                reader.line_num,
+                {key: value for key, value in record.items() if key and value != ""},
+            )
+        return
+    for line, content in enumerate(stream, start=1):
+        if not content.strip():
+            continue
+        try:
+            yield line, json.loads(content)
+        except json.JSONDecodeError:
+            yield line, None
+
+
+def reject(report: ArticleImportReport, line: int, detail: Any) -> None:
+    report.rejected_count += 1
+    if len(report.rejected) < MAX_REPORTED_REJECTIONS:
+        report.rejected.append(ArticleImportRejection(line=line, detail=detail))
+
+
+def load_chunk(
+    *,
+    connection: Connection,
+    rows: list[tuple[int, ArticleImport]],
+    owner_id: uuid.UUID,
+    report: ArticleImportReport,
+) -> None:
+    connection.execute(text(CREATE_STAGING_TABLE))
+    columns = ", ".join(STAGING_COLUMNS)
+    driver_connection = connection.connection.driver_connection
+    with (
+        driver_connection.cursor() as cursor,  # type: ignore[union-attr]
+        cursor.copy(f"COPY article_import ({columns}) FROM STDIN") as copy,
+    ):
+        for line, row in rows:
+            copy.write_row(
+                (
+                    line,
+                    row.id,
+                    row.title,
+                    row.description,
+                    row.article_type_id,
+                    row.created_at,
+                )
+            )
+    imported = connection.execute(
+        text(MERGE_STAGING_TABLE), {"owner_id": owner_id}
+    ).scalar_one()
+    unknown = connection.execute(text(UNKNOWN_ARTICLE_TYPES)).scalars().all()
+    connection.commit()
+    for line in unknown:
+        reject(report, line, "Article type not found")
+    report.imported += imported
+    report.duplicates += len(rows) - len(unknown) - imported
+
+
+def import_articles(
+    *,
+    connection: Connection,
+    stream: Iterable[str],
+    format: ImportFormat,
+    owner_id: uuid.UUID,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    on_progress: Callable[[ArticleImportReport], None] | None = None,
+) -> ArticleImportReport:
+    """
+    Load articles from an NDJSON or CSV stream, owned by `owner_id`.
+
+    Rows are validated and COPYed into a staging table `chunk_size` at a time,
+    then merged into article and committed, so memory use doesn't depend on
+    the size of the stream and an interrupted import keeps the loaded chunks.
+    """
+    report = ArticleImportReport()
+    rows: list[tuple[int, ArticleImport]] = []
+    for line, record in read_records(stream, format):
+        report.processed += 1
+        if record is None:
+            reject(report, line, "Invalid JSON")
+            continue
+        try:
+            rows.append((line, ArticleImport.model_validate(record)))
+        except ValidationError as e:
+            detail = e.errors(include_url=False, include_context=False)
+            reject(report, line, list(detail))
+        if len(rows) >= chunk_size:
+            load_chunk(
+                connection=connection, rows=rows, owner_id=owner_id, report=report
+            )
+            rows = []
+            if on_progress:
+                on_progress(report)
+    if rows:
+        load_chunk(connection=connection, rows=rows, owner_id=owner_id, report=report)
+    if report.imported:
+        response_cache.bump("article")
+    if on_progress:
+        on_progress(report)
+    return report
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Import articles from a file")
+    parser.add_argument("path", help="NDJSON or CSV file, one article per row")
+    parser.add_argument("--format", choices=["ndjson", "csv"])
+    parser.add_argument(
+        "--owner-email",
+        default=settings.FIRST_SUPERUSER,
+        help="owner of the imported articles",
+    )
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        owner = crud.get_user_by_email(session=session, email=args.owner_email)
+    if not owner:
+        parser.error(f"No user with email {args.owner_email}")
+
+    def log_progress(report: ArticleImportReport) -> None:
+        logger.info(
+            "%d rows processed, %d imported, %d duplicates, %d rejected",
+            report.processed,
+            report.imported,
+            report.duplicates,
+            report.rejected_count,
+        )
+
+    logger.info("Importing articles from %s", args.path)
+    with (
+        open(args.path, encoding="utf-8", newline="") as stream,
+        engine.connect() as connection,
+    ):
+        report = import_articles(
+            connection=connection,
+            stream=stream,
+            format=args.format or guess_format(args.path),
+            owner_id=owner.id,
+            chunk_size=args.chunk_size,
+            on_progress=log_progress,
+        )
+    for rejection in report.rejected:
+        logger.warning("Line %d rejected: %s", rejection.line, rejection.detail)
+    logger.info("Articles imported")
+
+
+if __name__ == "__main__":
+    main()
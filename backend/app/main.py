@@ -1,10 +1,21 @@
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
+from app.api.responses import FastJSONResponse
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.db import async_engine, engine, warm_async_pool, warm_pool
+from app.core.outbox import email_outbox
+from app.core.security import PasswordHasherBusy, password_hasher
+from app.utils import precompile_email_templates
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -14,12 +25,41 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncGenerator[None, None]:
+    if settings.POSTGRES_POOL_WARM:
+        await run_in_threadpool(warm_pool, engine)
+        await warm_async_pool(async_engine)
+    await run_in_threadpool(precompile_email_templates)
+    email_outbox.start()
+    yield
+    await run_in_threadpool(email_outbox.stop)
+    # Pooled async connections belong to this event loop
+    await async_engine.dispose()
+    await run_in_threadpool(password_hasher.shutdown)
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
 )
 
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(
+    _request: Request, _exc: PasswordHasherBusy
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many password checks in progress, try again later"},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Set all CORS enabled origins
 if settings.all_cors_origins:
     app.add_middleware(
@@ -30,4 +70,10 @@ if settings.all_cors_origins:
         allow_headers=["*"],
     )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    levels=settings.COMPRESSION_LEVELS,
+)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -1,9 +1,17 @@
 import uuid
+from datetime import datetime, timezone
+from typing import Any
 
 from pydantic import EmailStr
+from sqlalchemy import Column, Computed, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import Field, Relationship, SQLModel
 
 
+def get_datetime_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 # Shared properties
 class UserBase(SQLModel):
     email: EmailStr = Field(unique=True, index=True, max_length=255)
@@ -43,7 +51,11 @@ class UpdatePassword(SQLModel):
 class User(UserBase, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     hashed_password: str
-    articles: list["Article"] = Relationship(back_populates="owner", cascade_delete=True)
+    # Articles are removed by the ON DELETE CASCADE of their foreign key,
+    # passive_deletes keeps the ORM from loading them first
+    articles: list["Article"] = Relationship(
+        back_populates="owner", cascade_delete=True, passive_deletes=True
+    )
 
 
 # Properties to return via API, id is always required
@@ -53,7 +65,13 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    count: int | None
+
+
+# Author embedded in an article, without their email or flags
+class ArticleOwnerPublic(SQLModel):
+    id: uuid.UUID
+    full_name: str | None
 
 
 # Shared properties
@@ -74,12 +92,30 @@ class ArticleTypeUpdate(ArticleTypeBase):
 class ArticleType(SQLModel, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     name: str = Field(max_length=64)
-    articles: list["Article"] = Relationship(back_populates="article_type", cascade_delete=True)
+    # Indexed for the max() in the list's ETag
+    updated_at: datetime = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"onupdate": get_datetime_utc},
+        nullable=False,
+        index=True,
+    )
+    # Articles are removed by the ON DELETE CASCADE of their foreign key,
+    # passive_deletes keeps the ORM from loading them first
+    articles: list["Article"] = Relationship(
+        back_populates="article_type", cascade_delete=True, passive_deletes=True
+    )
 
 
 class ArticleTypesPublic(SQLModel):
     data: list[ArticleType]
-    count: int
+    count: int | None
+
+
+# Article type embedded in an article
+class ArticleTypePublic(ArticleTypeBase):
+    id: uuid.UUID
+    updated_at: datetime
 
 
 # Shared properties
@@ -98,10 +134,52 @@ class ArticleUpdate(ArticleBase):
     title: str | None = Field(default=None, min_length=1, max_length=255)  # type: ignore
 
 
+# Full-text search document, generated by Postgres from title and
+# description. Title matches rank above description ones. Not mapped on the
+# model so it is never loaded or written by the ORM.
+article_search_vector = Column(
+    "search_vector",
+    TSVECTOR,
+    Computed(
+        "setweight(to_tsvector('english', title), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+        persisted=True,
+    ),
+)
+
+
 # Database model, database table inferred from class name
 class Article(ArticleBase, table=True):
+    # Keyset pagination walks these indexes, see read_articles. The filtered
+    # ones also back the foreign keys for lookups and cascades.
+    __table_args__ = (
+        Index("ix_article_created_at_id", "created_at", "id"),
+        Index(
+            "ix_article_article_type_id_created_at_id",
+            "article_type_id",
+            "created_at",
+            "id",
+        ),
+        Index("ix_article_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        article_search_vector,
+        Index("ix_article_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     title: str = Field(max_length=255)
+    created_at: datetime = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        nullable=False,
+    )
+    # Bumped on every write, it is the version behind ETag and Last-Modified
+    updated_at: datetime = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"onupdate": get_datetime_utc},
+        nullable=False,
+    )
     owner_id: uuid.UUID = Field(
         foreign_key="user.id", nullable=False, ondelete="CASCADE"
     )
@@ -112,17 +190,119 @@ class Article(ArticleBase, table=True):
     article_type: ArticleType | None = Relationship(back_populates="articles")
 
 
-
 # Properties to return via API, id is always required
 class ArticlePublic(ArticleBase):
     id: uuid.UUID
     owner_id: uuid.UUID
     article_type_id: uuid.UUID
+    created_at: datetime
+    updated_at: datetime
 
 
 class ArticlesPublic(SQLModel):
     data: list[ArticlePublic]
-    count: int
+    count: int | None
+    next_cursor: str | None = None
+
+
+# Article with the relations asked for with `expand` embedded
+class ArticleExpandedPublic(ArticlePublic):
+    article_type: ArticleTypePublic | None = None
+    owner: ArticleOwnerPublic | None = None
+
+
+class ArticlesExpandedPublic(SQLModel):
+    data: list[ArticleExpandedPublic]
+    count: int | None
+    next_cursor: str | None = None
+
+
+# Item of a bulk creation, each one names its own article type
+class ArticleBulkCreate(ArticleCreate):
+    article_type_id: uuid.UUID
+
+
+# Why the item at `index` of a bulk creation was rejected
+class ArticleBulkError(SQLModel):
+    index: int
+    detail: str | list[dict[str, Any]]
+
+
+class ArticlesBulkPublic(SQLModel):
+    data: list[ArticlePublic]
+    errors: list[ArticleBulkError]
+
+
+# Row of an article import, ids and creation times of historical
+# coverage can be kept
+class ArticleImport(ArticleBulkCreate):
+    id: uuid.UUID = Field(default_factory=uuid.uuid4)
+    created_at: datetime = Field(default_factory=get_datetime_utc)
+
+
+# Why the row at `line` of an import file was rejected
+class ArticleImportRejection(SQLModel):
+    line: int
+    detail: str | list[dict[str, Any]]
+
+
+# Progress of an import, only the first rejections are listed
+class ArticleImportReport(SQLModel):
+    processed: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    rejected_count: int = 0
+    rejected: list[ArticleImportRejection] = []
+
+
+# Full-text search hit, highlights wrap matched words in <mark>
+class ArticleSearchPublic(ArticlePublic):
+    rank: float
+    title_highlight: str
+    description_highlight: str | None
+
+
+class ArticlesSearchPublic(SQLModel):
+    data: list[ArticleSearchPublic]
+    next_cursor: str | None = None
+
+
+# Row totals kept up to date by triggers, see app.core.db.init_row_counters
+class RowCount(SQLModel, table=True):
+    table_name: str = Field(primary_key=True, max_length=64)
+    count: int = 0
+
+
+# Email waiting for the outbox worker, see app.core.outbox. next_attempt_at is
+# cleared once the email is sent or given up on
+class EmailOutbox(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "ix_emailoutbox_next_attempt_at",
+            "next_attempt_at",
+            postgresql_where=text("next_attempt_at IS NOT NULL"),
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    email_to: str = Field(max_length=255)
+    subject: str
+    html_content: str
+    created_at: datetime = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        nullable=False,
+    )
+    attempts: int = 0
+    next_attempt_at: datetime | None = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+    sent_at: datetime | None = Field(
+        default=None,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+    last_error: str | None = None
 
 
 # Generic message
@@ -0,0 +1,102 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import Article
+from app.tests.utils.item import create_random_article_type, create_random_item
+
+
+def test_create_article_type(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/article_types/",
+        headers=superuser_token_headers,
+        json={"name": "Football"},
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["name"] == "Football"
+    assert "id" in content
+    assert "updated_at" in content
+
+
+def test_create_article_type_normal_user(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/article_types/",
+        headers=normal_user_token_headers,
+        json={"name": "Football"},
+    )
+    assert r.status_code == 400
+
+
+def test_read_article_type_not_found(client: TestClient) -> None:
+    r = client.get(f"{settings.API_V1_STR}/article_types/{uuid.uuid4()}")
+    assert r.status_code == 404
+
+
+def test_read_article_type_conditional(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    article_type = create_random_article_type(db)
+    url = f"{settings.API_V1_STR}/article_types/{article_type.id}"
+    r = client.get(url)
+    assert r.status_code == 200
+    assert r.json()["name"] == article_type.name
+    etag = r.headers["etag"]
+
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+
+    client.put(url, headers=superuser_token_headers, json={"name": "Renamed"})
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["name"] == "Renamed"
+
+
+def test_read_article_types_conditional(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    article_type = create_random_article_type(db)
+    url = f"{settings.API_V1_STR}/article_types/"
+    r = client.get(url)
+    assert r.status_code == 200
+    assert r.json()["count"] >= 1
+    etag = r.headers["etag"]
+    # Deletes don't move any date, so If-Modified-Since can't be answered
+    assert "last-modified" not in r.headers
+
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    r = client.get(url, params={"limit": 1}, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+
+    r = client.delete(
+        f"{settings.API_V1_STR}/article_types/{article_type.id}",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+    r = client.get(url, headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    assert r.status_code == 200
+
+
+def test_delete_article_type_with_articles(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    article_type = create_random_article_type(db)
+    article = create_random_item(db, article_type=article_type)
+    article_id = article.id
+    r = client.delete(
+        f"{settings.API_V1_STR}/article_types/{article_type.id}",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    db.expire_all()
+    assert db.get(Article, article_id) is None
@@ -0,0 +1,798 @@
+import gzip
+import json
+import uuid
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.db import async_engine, init_row_counters
+from app.models import (
+    ArticleCreate,
+    ArticleSearchPublic,
+    ArticleType,
+    RowCount,
+    User,
+)
+from app.tests.utils.item import create_random_article_type, create_random_item
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_lower_string
+
+
+def test_create_article(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    article_type = create_random_article_type(db)
+    data = {"title": "Foo", "description": "Fighters"}
+    r = client.post(
+        f"{settings.API_V1_STR}/articles/",
+        headers=superuser_token_headers,
+        params={"article_type_id": str(article_type.id)},
+        json=data,
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["title"] == data["title"]
+    assert content["description"] == data["description"]
+    assert content["article_type_id"] == str(article_type.id)
+    assert "id" in content
+    assert "owner_id" in content
+    assert "created_at" in content
+
+
+def test_create_articles_bulk(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    article_type = create_random_article_type(db)
+    data = [
+        {"title": "First", "article_type_id": str(article_type.id)},
+        {"title": "", "article_type_id": str(article_type.id)},
+        {"title": "Orphan", "article_type_id": str(uuid.uuid4())},
+        {
+            "title": "Second",
+            "description": "x",
+            "article_type_id": str(article_type.id),
+        },
+    ]
+    r = client.post(
+        f"{settings.API_V1_STR}/articles/bulk",
+        headers=superuser_token_headers,
+        json=data,
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert [article["title"] for article in content["data"]] == ["First", "Second"]
+    assert all(
+        article["article_type_id"] == str(article_type.id)
+        for article in content["data"]
+    )
+    assert [error["index"] for error in content["errors"]] == [1, 2]
+    assert content["errors"][1]["detail"] == "Article type not found"
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/",
+        params={"article_type_id": str(article_type.id)},
+    )
+    assert r.json()["count"] == 2
+
+
+def test_create_articles_bulk_too_many(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/articles/bulk",
+        headers=superuser_token_headers,
+        json=[{"title": "x"}] * 1001,
+    )
+    assert r.status_code == 422
+
+
+def test_create_articles_bulk_schema(client: TestClient) -> None:
+    r = client.get(f"{settings.API_V1_STR}/openapi.json")
+    operation = r.json()["paths"][f"{settings.API_V1_STR}/articles/bulk"]["post"]
+    schema = operation["requestBody"]["content"]["application/json"]["schema"]
+    assert schema["type"] == "array"
+    assert schema["maxItems"] == 1000
+    assert schema["items"]["title"] == "ArticleBulkCreate"
+    assert schema["items"]["required"] == ["title", "article_type_id"]
+
+
+def test_import_articles_ndjson(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    article_type = create_random_article_type(db)
+    article_id = uuid.uuid4()
+    lines = [
+        {
+            "id": str(article_id),
+            "title": "Historic final",
+            "article_type_id": str(article_type.id),
+            "created_at": "2006-07-09T20:00:00Z",
+        },
+        {"title": "", "article_type_id": str(article_type.id)},
+        {"title": "Orphan", "article_type_id": str(uuid.uuid4())},
+    ]
+    content = "\n".join(json.dumps(line) for line in lines) + "\nnot json\n"
+    r = client.post(
+        f"{settings.API_V1_STR}/articles/import",
+        headers=superuser_token_headers,
+        files={"file": ("articles.ndjson", content)},
+    )
+    assert r.status_code == 200
+    report = r.json()
+    assert report["processed"] == 4
+    assert report["imported"] == 1
+    assert report["rejected_count"] == 3
+    assert sorted(rejection["line"] for rejection in report["rejected"]) == [2, 3, 4]
+    r = client.get(f"{settings.API_V1_STR}/articles/{article_id}")
+    assert r.json()["created_at"].startswith("2006-07-09T20:00:00")
+
+    # Importing the same file again skips the rows already loaded
+    r = client.post(
+        f"{settings.API_V1_STR}/articles/import",
+        headers=superuser_token_headers,
+        files={"file": ("articles.ndjson", content)},
+    )
+    assert r.json()["imported"] == 0
+    assert r.json()["duplicates"] == 1
+
+
+def test_import_articles_csv(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    article_type = create_random_article_type(db)
+    rows = "".join(f"Match {i},,{article_type.id}\r\n" for i in range(5))
+    r = client.post(
+        f"{settings.API_V1_STR}/articles/import",
+        headers=superuser_token_headers,
+        files={
+            "file": ("articles.csv", "title,description,article_type_id\r\n" + rows)
+        },
+    )
+    assert r.status_code == 200
+    assert r.json()["imported"] == 5
+    assert r.json()["rejected_count"] == 0
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/",
+        params={"article_type_id": str(article_type.id)},
+    )
+    assert r.json()["count"] == 5
+    assert all(article["description"] is None for article in r.json()["data"])
+
+
+def test_import_articles_normal_user(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/articles/import",
+        headers=normal_user_token_headers,
+        files={"file": ("articles.ndjson", "")},
+    )
+    assert r.status_code == 403
+
+
+def test_export_articles(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    article = create_random_item(db)
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/export", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/x-ndjson"
+    exported = [json.loads(line) for line in r.text.splitlines()]
+    assert len(exported) == r.text.count("\n")
+    assert {
+        "id": str(article.id),
+        "title": article.title,
+        "description": article.description,
+        "owner_id": str(article.owner_id),
+        "article_type_id": str(article.article_type_id),
+    }.items() <= next(
+        line for line in exported if line["id"] == str(article.id)
+    ).items()
+    # Serialized like the API serves the article
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/{article.id}", headers=superuser_token_headers
+    )
+    assert r.json() in exported
+
+
+def test_export_articles_gzip(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    article = create_random_item(db)
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/export",
+        headers=superuser_token_headers,
+        params={"gzip": True},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/gzip"
+    lines = gzip.decompress(r.content).decode().splitlines()
+    assert str(article.id) in {json.loads(line)["id"] for line in lines}
+
+
+def test_export_articles_normal_user(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/export", headers=normal_user_token_headers
+    )
+    assert r.status_code == 403
+
+
+def test_read_article(client: TestClient, db: Session) -> None:
+    article = create_random_item(db)
+    r = client.get(f"{settings.API_V1_STR}/articles/{article.id}")
+    assert r.status_code == 200
+    content = r.json()
+    assert content["title"] == article.title
+    assert content["id"] == str(article.id)
+    assert content["owner_id"] == str(article.owner_id)
+
+
+def test_read_article_fields(client: TestClient, db: Session) -> None:
+    article = create_random_item(db)
+    url = f"{settings.API_V1_STR}/articles/{article.id}"
+    # Read from the database first, then cut out of the cached article
+    partial = client.get(url, params={"fields": "title"})
+    client.get(url)
+    cut = client.get(url, params={"fields": "title"})
+    for r in (partial, cut):
+        assert r.status_code == 200
+        assert r.json() == {"title": article.title}
+    assert partial.headers["etag"] == cut.headers["etag"]
+    assert partial.headers["etag"] != client.get(url).headers["etag"]
+    r = client.get(
+        url,
+        params={"fields": "title"},
+        headers={"If-None-Match": partial.headers["etag"]},
+    )
+    assert r.status_code == 304
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/{uuid.uuid4()}", params={"fields": "id"}
+    )
+    assert r.status_code == 404
+
+
+def test_read_article_expand(client: TestClient, db: Session) -> None:
+    article = create_random_item(db)
+    owner = db.get(User, article.owner_id)
+    assert owner
+    owner.full_name = "Article Owner"
+    db.add(owner)
+    db.commit()
+    url = f"{settings.API_V1_STR}/articles/{article.id}"
+    # Read from the database first, then from the cached article
+    read = client.get(url, params={"expand": "owner"})
+    client.get(url)
+    cut = client.get(url, params={"expand": "owner"})
+    for r in (read, cut):
+        assert r.status_code == 200
+        content = r.json()
+        assert content["title"] == article.title
+        assert content["owner"] == {"id": str(owner.id), "full_name": "Article Owner"}
+        assert "article_type" not in content
+    assert read.headers["etag"] == cut.headers["etag"]
+
+    r = client.get(url, params={"expand": "article_type", "fields": "id"})
+    assert set(r.json()) == {"id", "article_type"}
+    etag = r.headers["etag"]
+    article_type = db.get(ArticleType, article.article_type_id)
+    assert article_type
+    article_type.name = "renamed"
+    db.add(article_type)
+    db.commit()
+    r = client.get(
+        url,
+        params={"expand": "article_type", "fields": "id"},
+        headers={"If-None-Match": etag},
+    )
+    assert r.status_code == 200
+    assert r.json()["article_type"]["name"] == "renamed"
+
+
+def test_read_article_not_found(client: TestClient) -> None:
+    r = client.get(f"{settings.API_V1_STR}/articles/{uuid.uuid4()}")
+    assert r.status_code == 404
+
+
+def test_read_articles(client: TestClient, db: Session) -> None:
+    create_random_item(db)
+    create_random_item(db)
+    r = client.get(f"{settings.API_V1_STR}/articles/")
+    assert r.status_code == 200
+    content = r.json()
+    assert len(content["data"]) >= 2
+    assert content["count"] >= 2
+
+
+def test_read_articles_cursor_pagination(client: TestClient, db: Session) -> None:
+    created = {str(create_random_item(db).id) for _ in range(5)}
+    r = client.get(f"{settings.API_V1_STR}/articles/", params={"limit": 2})
+    content = r.json()
+    assert r.status_code == 200
+    assert len(content["data"]) == 2
+    seen = [article["id"] for article in content["data"]]
+    created_at = [article["created_at"] for article in content["data"]]
+    while content["next_cursor"]:
+        r = client.get(
+            f"{settings.API_V1_STR}/articles/",
+            params={"limit": 2, "cursor": content["next_cursor"]},
+        )
+        assert r.status_code == 200
+        content = r.json()
+        seen += [article["id"] for article in content["data"]]
+        created_at += [article["created_at"] for article in content["data"]]
+    assert len(seen) == len(set(seen))
+    assert created <= set(seen)
+    assert created_at == sorted(created_at, reverse=True)
+
+
+def test_read_articles_fields(client: TestClient, db: Session) -> None:
+    created = {str(create_random_item(db).id) for _ in range(3)}
+    params: dict[str, Any] = {"limit": 2, "fields": "title, id"}
+    r = client.get(f"{settings.API_V1_STR}/articles/", params=params)
+    content = r.json()
+    assert r.status_code == 200
+    assert [list(article) for article in content["data"]] == [["title", "id"]] * 2
+    seen = [article["id"] for article in content["data"]]
+    # Cursors still work without created_at in the page
+    while content["next_cursor"]:
+        params["cursor"] = content["next_cursor"]
+        r = client.get(f"{settings.API_V1_STR}/articles/", params=params)
+        content = r.json()
+        assert all(list(article) == ["title", "id"] for article in content["data"])
+        seen += [article["id"] for article in content["data"]]
+    assert created <= set(seen)
+
+
+def test_read_articles_unknown_fields(client: TestClient) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/", params={"fields": "id,owner,body"}
+    )
+    assert r.status_code == 422
+    assert r.json()["detail"] == "Unknown fields: body, owner"
+    r = client.get(f"{settings.API_V1_STR}/articles/", params={"fields": ","})
+    assert r.status_code == 422
+
+
+def test_read_articles_expand(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    article_type = create_random_article_type(db)
+    articles = [create_random_item(db, article_type) for _ in range(3)]
+    url = f"{settings.API_V1_STR}/articles/"
+    params = {
+        "article_type_id": str(article_type.id),
+        "fields": "title",
+        "expand": "owner,article_type",
+    }
+    r = client.get(url, params=params)
+    assert r.status_code == 200
+    content = r.json()
+    assert len(content["data"]) == 3
+    owners = {str(article.id): article.owner_id for article in articles}
+    for article in content["data"]:
+        assert list(article) == ["title", "article_type", "owner"]
+        assert article["article_type"]["name"] == article_type.name
+        assert article["owner"]["full_name"] is None
+        assert set(article["owner"]) == {"id", "full_name"}
+    assert {article["owner"]["id"] for article in content["data"]} == {
+        str(owner_id) for owner_id in owners.values()
+    }
+
+    # Renaming an owner through the API refreshes the cached page
+    r = client.patch(
+        f"{settings.API_V1_STR}/users/{articles[0].owner_id}",
+        headers=superuser_token_headers,
+        json={"full_name": "Renamed Owner"},
+    )
+    assert r.status_code == 200
+    names = {
+        a["owner"]["full_name"] for a in client.get(url, params=params).json()["data"]
+    }
+    assert "Renamed Owner" in names
+
+
+def test_expanded_articles_schema(client: TestClient) -> None:
+    openapi = client.get(f"{settings.API_V1_STR}/openapi.json").json()
+    schemas = openapi["components"]["schemas"]
+    article = schemas["ArticleExpandedPublic"]["properties"]
+    assert {"$ref": "#/components/schemas/ArticleOwnerPublic"} in article["owner"][
+        "anyOf"
+    ]
+    assert {"$ref": "#/components/schemas/ArticleTypePublic"} in article[
+        "article_type"
+    ]["anyOf"]
+    for path, model in (
+        ("/articles/", "ArticlesExpandedPublic"),
+        ("/articles/{id}", "ArticleExpandedPublic"),
+    ):
+        response = openapi["paths"][f"{settings.API_V1_STR}{path}"]["get"]["responses"][
+            "200"
+        ]
+        assert response["content"]["application/json"]["schema"] == {
+            "$ref": f"#/components/schemas/{model}"
+        }
+
+
+def test_read_articles_expand_queries(client: TestClient, db: Session) -> None:
+    article_type = create_random_article_type(db)
+    for _ in range(6):
+        create_random_item(db, article_type)
+    statements: list[str] = []
+
+    def record(*args: Any) -> None:
+        statements.append(args[2])
+
+    def count_queries(limit: int) -> int:
+        statements.clear()
+        r = client.get(
+            f"{settings.API_V1_STR}/articles/",
+            params={
+                "article_type_id": str(article_type.id),
+                "limit": limit,
+                "expand": "article_type,owner",
+            },
+        )
+        assert len(r.json()["data"]) == limit
+        return len(statements)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        assert count_queries(2) == count_queries(6) > 0
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+def test_read_articles_unknown_expansion(client: TestClient) -> None:
+    r = client.get(f"{settings.API_V1_STR}/articles/", params={"expand": "comments"})
+    assert r.status_code == 422
+    assert r.json()["detail"] == "Unknown expansions: comments"
+
+
+def test_read_articles_invalid_cursor(client: TestClient) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/", params={"cursor": "not-a-cursor"}
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid cursor"
+
+
+def article_triggers(db: Session) -> list[str]:
+    statement = text(
+        "SELECT tgname FROM pg_trigger "
+        "WHERE tgrelid = 'article'::regclass AND tgname LIKE '%rowcount%' "
+        "ORDER BY tgname"
+    )
+    return list(db.execute(statement).scalars())
+
+
+def test_row_counters_installed_for_counter_strategy(db: Session) -> None:
+    # Without the counter strategy articles are left uncounted, their writes
+    # don't queue on the RowCount row
+    assert article_triggers(db) == []
+    assert db.get(RowCount, "article") is None
+    assert db.get(RowCount, "articletype") is not None
+    try:
+        init_row_counters(db, "counter")
+        assert article_triggers(db) == [
+            "article_rowcount_delete",
+            "article_rowcount_insert",
+            "article_rowcount_truncate",
+        ]
+    finally:
+        init_row_counters(db)
+    assert article_triggers(db) == []
+
+
+def test_read_articles_count_strategies(client: TestClient, db: Session) -> None:
+    create_random_item(db)
+    r = client.get(f"{settings.API_V1_STR}/articles/")
+    exact = r.json()["count"]
+    try:
+        init_row_counters(db, "counter")
+        r = client.get(
+            f"{settings.API_V1_STR}/articles/", params={"count_strategy": "counter"}
+        )
+        assert r.status_code == 200
+        assert r.json()["count"] == exact
+    finally:
+        init_row_counters(db)
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/", params={"count_strategy": "estimated"}
+    )
+    assert r.status_code == 200
+    assert isinstance(r.json()["count"], int)
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/", params={"count_strategy": "none"}
+    )
+    assert r.status_code == 200
+    assert r.json()["count"] is None
+
+
+def test_read_articles_exact_count_past_last_page(
+    client: TestClient, db: Session
+) -> None:
+    create_random_item(db)
+    r = client.get(f"{settings.API_V1_STR}/articles/")
+    count = r.json()["count"]
+    r = client.get(f"{settings.API_V1_STR}/articles/", params={"skip": count + 10})
+    assert r.status_code == 200
+    assert r.json() == {"data": [], "count": count, "next_cursor": None}
+
+
+def test_read_articles_filters(client: TestClient, db: Session) -> None:
+    article = create_random_item(db)
+    same_type = create_random_item(db, article_type=article.article_type)
+    create_random_item(db)
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/",
+        params={"article_type_id": str(article.article_type_id)},
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert {a["id"] for a in content["data"]} == {str(article.id), str(same_type.id)}
+    assert content["count"] == 2
+
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/", params={"owner_id": str(article.owner_id)}
+    )
+    assert [a["id"] for a in r.json()["data"]] == [str(article.id)]
+
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/",
+        params={
+            "article_type_id": str(article.article_type_id),
+            "created_after": article.created_at.isoformat(),
+            "created_before": same_type.created_at.isoformat(),
+        },
+    )
+    assert [a["id"] for a in r.json()["data"]] == [str(article.id)]
+
+
+def test_search_articles(client: TestClient, db: Session) -> None:
+    article_type = create_random_article_type(db)
+    owner = create_random_user(db)
+    word = random_lower_string()
+    in_title = crud.create_item(
+        session=db,
+        item_in=ArticleCreate(title=f"{word} wins <the> cup", description="final"),
+        owner_id=owner.id,
+        article_type_id=article_type.id,
+    )
+    in_description = crud.create_item(
+        session=db,
+        item_in=ArticleCreate(title="match report", description=f"{word} scores"),
+        owner_id=owner.id,
+        article_type_id=article_type.id,
+    )
+    r = client.get(f"{settings.API_V1_STR}/articles/search", params={"q": word})
+    assert r.status_code == 200
+    content = r.json()
+    assert [a["id"] for a in content["data"]] == [
+        str(in_title.id),
+        str(in_description.id),
+    ]
+    first = content["data"][0]
+    assert list(first) == list(ArticleSearchPublic.model_fields)
+    assert first["title_highlight"] == f"<mark>{word}</mark> wins &lt;the&gt; cup"
+    assert first["description_highlight"] == "final"
+    assert content["next_cursor"] is None
+
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/search", params={"q": word, "limit": 1}
+    )
+    content = r.json()
+    assert [a["id"] for a in content["data"]] == [str(in_title.id)]
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/search",
+        params={"q": word, "limit": 1, "cursor": content["next_cursor"]},
+    )
+    assert [a["id"] for a in r.json()["data"]] == [str(in_description.id)]
+
+
+def test_search_articles_pages_through_equal_ranks(
+    client: TestClient, db: Session
+) -> None:
+    article_type = create_random_article_type(db)
+    owner = create_random_user(db)
+    word = random_lower_string()
+    ids = {
+        str(
+            crud.create_item(
+                session=db,
+                # Ranked 0.4 as a real, not exactly 0.4 as a double
+                item_in=ArticleCreate(title="match report", description=word),
+                owner_id=owner.id,
+                article_type_id=article_type.id,
+            ).id
+        )
+        for _ in range(4)
+    }
+    seen: list[str] = []
+    params: dict[str, Any] = {"q": word, "limit": 1}
+    # Bounded, a cursor that doesn't advance would loop forever
+    for _ in range(len(ids) + 2):
+        content = client.get(
+            f"{settings.API_V1_STR}/articles/search", params=params
+        ).json()
+        seen += [article["id"] for article in content["data"]]
+        if content["next_cursor"] is None:
+            break
+        params["cursor"] = content["next_cursor"]
+    assert sorted(seen) == sorted(ids)
+
+
+def test_search_articles_requires_query(client: TestClient) -> None:
+    r = client.get(f"{settings.API_V1_STR}/articles/search", params={"q": ""})
+    assert r.status_code == 422
+
+
+def test_read_article_is_cached_until_updated(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    article = create_random_item(db)
+    r = client.get(f"{settings.API_V1_STR}/articles/{article.id}")
+    assert r.json()["title"] == article.title
+
+    # Written behind the API's back, so the cached payload is still served
+    article.title = "Changed in the database"
+    db.add(article)
+    db.commit()
+    r = client.get(f"{settings.API_V1_STR}/articles/{article.id}")
+    assert r.json()["title"] != "Changed in the database"
+
+    r = client.put(
+        f"{settings.API_V1_STR}/articles/{article.id}",
+        headers=superuser_token_headers,
+        json={"title": "Changed through the API"},
+    )
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/articles/{article.id}")
+    assert r.json()["title"] == "Changed through the API"
+
+    r = client.delete(
+        f"{settings.API_V1_STR}/articles/{article.id}",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/articles/{article.id}")
+    assert r.status_code == 404
+
+
+def test_read_article_conditional(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    article = create_random_item(db)
+    url = f"{settings.API_V1_STR}/articles/{article.id}"
+    r = client.get(url)
+    etag = r.headers["etag"]
+    last_modified = r.headers["last-modified"]
+
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+    r = client.get(url, headers={"If-None-Match": f"W/{etag}"})
+    assert r.status_code == 304
+    r = client.get(url, headers={"If-Modified-Since": last_modified})
+    assert r.status_code == 304
+
+    client.put(url, headers=superuser_token_headers, json={"title": "Updated"})
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["title"] == "Updated"
+    assert r.headers["etag"] != etag
+
+
+def test_read_articles_is_cached_until_written(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    article = create_random_item(db)
+    params = {"article_type_id": str(article.article_type_id)}
+    r = client.get(f"{settings.API_V1_STR}/articles/", params=params)
+    assert r.json()["count"] == 1
+    etag = r.headers["etag"]
+    r = client.get(
+        f"{settings.API_V1_STR}/articles/",
+        params=params,
+        headers={"If-None-Match": etag},
+    )
+    assert r.status_code == 304
+
+    # Not written through the API, so the cached page is still served
+    create_random_item(db, article_type=article.article_type)
+    r = client.get(f"{settings.API_V1_STR}/articles/", params=params)
+    assert r.json()["count"] == 1
+
+    r = client.post(
+        f"{settings.API_V1_STR}/articles/",
+        headers=superuser_token_headers,
+        params={"article_type_id": str(article.article_type_id)},
+        json={"title": "Fresh"},
+    )
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/articles/", params=params)
+    assert r.json()["count"] == 3
+    assert r.headers["etag"] != etag
+
+
+def test_update_article(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    article = create_random_item(db)
+    r = client.put(
+        f"{settings.API_V1_STR}/articles/{article.id}",
+        headers=superuser_token_headers,
+        json={"title": "Updated"},
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["title"] == "Updated"
+    assert content["description"] == article.description
+    assert content["updated_at"] > article.updated_at.isoformat()
+
+
+def test_update_article_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.put(
+        f"{settings.API_V1_STR}/articles/{uuid.uuid4()}",
+        headers=superuser_token_headers,
+        json={"title": "Updated"},
+    )
+    assert r.status_code == 404
+
+
+def test_update_article_not_enough_permissions(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    article = create_random_item(db)
+    r = client.put(
+        f"{settings.API_V1_STR}/articles/{article.id}",
+        headers=normal_user_token_headers,
+        json={"title": "Updated"},
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Not enough permissions"
+
+
+def test_delete_article(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    article = create_random_item(db)
+    r = client.delete(
+        f"{settings.API_V1_STR}/articles/{article.id}",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/articles/{article.id}")
+    assert r.status_code == 404
+
+
+def test_delete_article_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.delete(
+        f"{settings.API_V1_STR}/articles/{uuid.uuid4()}",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 404
+
+
+def test_delete_article_not_enough_permissions(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    article = create_random_item(db)
+    r = client.delete(
+        f"{settings.API_V1_STR}/articles/{article.id}",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 400
+    r = client.get(f"{settings.API_V1_STR}/articles/{article.id}")
+    assert r.status_code == 200
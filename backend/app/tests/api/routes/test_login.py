@@ -1,11 +1,14 @@
-from unittest.mock import patch
-
+import pytest
 from fastapi.testclient import TestClient
+from passlib.hash import bcrypt
 from sqlmodel import Session, select
 
+from app import crud
 from app.core.config import settings
-from app.core.security import verify_password
-from app.models import User
+from app.core.security import password_hasher, verify_password
+from app.models import User, UserCreate
+from app.tests.utils.smtp import SMTPState
+from app.tests.utils.utils import random_email, random_lower_string
 from app.utils import generate_password_reset_token
 
 
@@ -43,19 +46,19 @@ def test_use_access_token(
 
 
 def test_recovery_password(
-    client: TestClient, normal_user_token_headers: dict[str, str]
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    smtp_server: SMTPState,
 ) -> None:
-    with (
-        patch("app.core.config.settings.SMTP_HOST", "smtp.example.com"),
-        patch("app.core.config.settings.SMTP_USER", "admin@example.com"),
-    ):
-        email = "test@example.com"
-        r = client.post(
-            f"{settings.API_V1_STR}/password-recovery/{email}",
-            headers=normal_user_token_headers,
-        )
-        assert r.status_code == 200
-        assert r.json() == {"message": "Password recovery email sent"}
+    email = "test@example.com"
+    r = client.post(
+        f"{settings.API_V1_STR}/password-recovery/{email}",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 200
+    assert r.json() == {"message": "Password recovery email sent"}
+    assert smtp_server.wait_for(1)
+    assert "Password recovery" in smtp_server.emails[0].data
 
 
 def test_recovery_password_user_not_exits(
@@ -102,3 +105,36 @@ def test_reset_password_invalid_token(
     assert "detail" in response
     assert r.status_code == 400
     assert response["detail"] == "Invalid token"
+
+
+def test_get_access_token_rehashes_stale_hash(client: TestClient, db: Session) -> None:
+    email, password = random_email(), random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=UserCreate(email=email, password=password)
+    )
+    stale_rounds = 4 if settings.BCRYPT_ROUNDS != 4 else 5
+    user.hashed_password = bcrypt.using(rounds=stale_rounds).hash(password)
+    db.add(user)
+    db.commit()
+    r = client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": email, "password": password},
+    )
+    assert r.status_code == 200
+    db.refresh(user)
+    assert bcrypt.from_string(user.hashed_password).rounds == settings.BCRYPT_ROUNDS
+
+
+def test_login_password_hasher_busy(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(password_hasher, "queue_limit", -password_hasher.workers)
+    r = client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={
+            "username": settings.FIRST_SUPERUSER,
+            "password": settings.FIRST_SUPERUSER_PASSWORD,
+        },
+    )
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "1"
@@ -1,13 +1,18 @@
 import uuid
-from unittest.mock import patch
+from typing import Any
 
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlmodel import Session, select
 
 from app import crud
 from app.core.config import settings
+from app.core.db import engine
 from app.core.security import verify_password
-from app.models import User, UserCreate
+from app.models import Article, User, UserCreate
+from app.tests.utils.item import create_random_article_type, create_random_item
+from app.tests.utils.smtp import SMTPState
+from app.tests.utils.user import user_authentication_headers
 from app.tests.utils.utils import random_email, random_lower_string
 
 
@@ -34,26 +39,27 @@ def test_get_users_normal_user_me(
 
 
 def test_create_user_new_email(
-    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    db: Session,
+    smtp_server: SMTPState,
 ) -> None:
-    with (
-        patch("app.utils.send_email", return_value=None),
-        patch("app.core.config.settings.SMTP_HOST", "smtp.example.com"),
-        patch("app.core.config.settings.SMTP_USER", "admin@example.com"),
-    ):
-        username = random_email()
-        password = random_lower_string()
-        data = {"email": username, "password": password}
-        r = client.post(
-            f"{settings.API_V1_STR}/users/",
-            headers=superuser_token_headers,
-            json=data,
-        )
-        assert 200 <= r.status_code < 300
-        created_user = r.json()
-        user = crud.get_user_by_email(session=db, email=username)
-        assert user
-        assert user.email == created_user["email"]
+    username = random_email()
+    password = random_lower_string()
+    data = {"email": username, "password": password}
+    r = client.post(
+        f"{settings.API_V1_STR}/users/",
+        headers=superuser_token_headers,
+        json=data,
+    )
+    assert 200 <= r.status_code < 300
+    created_user = r.json()
+    user = crud.get_user_by_email(session=db, email=username)
+    assert user
+    assert user.email == created_user["email"]
+    # Sent in the background by the outbox worker
+    assert smtp_server.wait_for(1)
+    assert smtp_server.emails[0].rcpt_to == [f"<{username}>"]
 
 
 def test_get_existing_user(
@@ -168,6 +174,44 @@ def test_retrieve_users(
         assert "email" in item
 
 
+def test_retrieve_users_fields(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/users/",
+        headers=superuser_token_headers,
+        params={"fields": "email"},
+    )
+    assert r.status_code == 200
+    assert all(list(user) == ["email"] for user in r.json()["data"])
+    r = client.get(
+        f"{settings.API_V1_STR}/users/",
+        headers=superuser_token_headers,
+        params={"fields": "email,hashed_password"},
+    )
+    assert r.status_code == 422
+
+
+def test_retrieve_users_never_reads_password_hashes(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    statements: list[str] = []
+
+    def record(*args: Any) -> None:
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        r = client.get(f"{settings.API_V1_STR}/users/", headers=superuser_token_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert r.status_code == 200
+    assert all("hashed_password" not in item for item in r.json()["data"])
+    listed = [statement for statement in statements if 'FROM "user"' in statement]
+    assert listed
+    assert all("hashed_password" not in statement for statement in listed)
+
+
 def test_update_user_me(
     client: TestClient, normal_user_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -433,6 +477,11 @@ def test_delete_user_super_user(
     user_in = UserCreate(email=username, password=password)
     user = crud.create_user(session=db, user_create=user_in)
     user_id = user.id
+    article = create_random_item(db)
+    article.owner_id = user_id
+    db.add(article)
+    db.commit()
+    article_id = article.id
     r = client.delete(
         f"{settings.API_V1_STR}/users/{user_id}",
         headers=superuser_token_headers,
@@ -442,6 +491,8 @@ def test_delete_user_super_user(
     assert deleted_user["message"] == "User deleted successfully"
     result = db.exec(select(User).where(User.id == user_id)).first()
     assert result is None
+    db.expire_all()
+    assert db.get(Article, article_id) is None
 
 
 def test_delete_user_not_found(
@@ -484,3 +535,33 @@ def test_delete_user_without_privileges(
     )
     assert r.status_code == 403
     assert r.json()["detail"] == "The user doesn't have enough privileges"
+
+
+def test_deactivated_user_is_refused_despite_cache(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=UserCreate(email=email, password=password)
+    )
+    headers = user_authentication_headers(client=client, email=email, password=password)
+    article_type = create_random_article_type(db)
+
+    def create_article() -> int:
+        r = client.post(
+            f"{settings.API_V1_STR}/articles/",
+            headers=headers,
+            params={"article_type_id": str(article_type.id)},
+            json={"title": "Foo"},
+        )
+        return r.status_code
+
+    assert create_article() == 200
+    r = client.patch(
+        f"{settings.API_V1_STR}/users/{user.id}",
+        headers=superuser_token_headers,
+        json={"is_active": False},
+    )
+    assert r.status_code == 200
+    assert create_article() == 400
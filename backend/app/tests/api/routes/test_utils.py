@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def test_read_metrics(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/metrics/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert "pid" in content
+    assert {"hits", "misses", "evictions"} <= content["article_cache"].keys()
+    assert {"hits", "misses", "evictions"} <= content["user_cache"].keys()
+
+
+def test_read_metrics_normal_user(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/metrics/", headers=normal_user_token_headers
+    )
+    assert r.status_code == 403
+
+
+def test_read_metrics_pool(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/metrics/", headers=superuser_token_headers
+    )
+    pool = r.json()["db_pool"]
+    assert pool["size"] == settings.POSTGRES_POOL_SIZE
+    assert pool["checked_out"] >= 0
+    # Every checkout is timed, including those of the requests above
+    assert pool["wait_seconds"]["count"] > 0
+    assert r.json()["db_async_pool"]["size"] == settings.POSTGRES_ASYNC_POOL_SIZE
@@ -0,0 +1,60 @@
+import time
+import uuid
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_token_data
+from app.core.cache import token_cache
+from app.core.config import settings
+from app.core.db import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from app.core.security import create_access_token
+
+
+def test_get_token_data_is_cached() -> None:
+    subject = uuid.uuid4()
+    token = create_access_token(subject, expires_delta=timedelta(minutes=5))
+    hits = token_cache.hits
+    assert get_token_data(token).sub == str(subject)
+    assert get_token_data(token).sub == str(subject)
+    assert token_cache.hits == hits + 1
+
+
+def test_get_token_data_cache_honors_expiry() -> None:
+    token = create_access_token(uuid.uuid4(), expires_delta=timedelta(seconds=1))
+    get_token_data(token)
+    time.sleep(1.1)
+    assert token_cache.get(token) is None
+    with pytest.raises(HTTPException) as e:
+        get_token_data(token)
+    assert e.value.status_code == 403
+
+
+def test_get_token_data_invalid_token_not_cached() -> None:
+    with pytest.raises(HTTPException):
+        get_token_data("not-a-token")
+    assert token_cache.get("not-a-token") is None
+
+
+def test_current_user_shares_the_sync_connection(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    async_checkouts = InstrumentedAsyncQueuePool.wait_time.stats()["count"]
+    checkouts = InstrumentedQueuePool.wait_time.stats()["count"]
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers)
+    assert r.status_code == 200
+    assert InstrumentedAsyncQueuePool.wait_time.stats()["count"] == async_checkouts
+    assert InstrumentedQueuePool.wait_time.stats()["count"] == checkouts + 1
+
+
+def test_current_superuser_shares_the_sync_connection(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    async_checkouts = InstrumentedAsyncQueuePool.wait_time.stats()["count"]
+    checkouts = InstrumentedQueuePool.wait_time.stats()["count"]
+    r = client.get(f"{settings.API_V1_STR}/users/", headers=superuser_token_headers)
+    assert r.status_code == 200
+    assert InstrumentedAsyncQueuePool.wait_time.stats()["count"] == async_checkouts
+    assert InstrumentedQueuePool.wait_time.stats()["count"] == checkouts + 1
@@ -1,13 +1,17 @@
+import threading
 from collections.abc import Generator
+from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, delete
 
+from app.core.cache import article_cache, response_cache, user_cache
 from app.core.config import settings
 from app.core.db import engine, init_db
 from app.main import app
-from app.models import Article, User
+from app.models import Article, ArticleType, EmailOutbox, User
+from app.tests.utils.smtp import FakeSMTPServer, SMTPState
 from app.tests.utils.user import authentication_token_from_email
 from app.tests.utils.utils import get_superuser_token_headers
 
@@ -21,9 +25,21 @@ def db() -> Generator[Session, None, None]:
         session.execute(statement)
         statement = delete(User)
         session.execute(statement)
+        statement = delete(ArticleType)
+        session.execute(statement)
+        statement = delete(EmailOutbox)
+        session.execute(statement)
         session.commit()
 
 
+@pytest.fixture(autouse=True)
+def reset_caches() -> None:
+    # Tests also write through the session directly, which caches can't see
+    article_cache.clear()
+    user_cache.clear()
+    response_cache.bump("article", "articletype")
+
+
 @pytest.fixture(scope="module")
 def client() -> Generator[TestClient, None, None]:
     with TestClient(app) as c:
@@ -40,3 +56,21 @@ def normal_user_token_headers(client: TestClient, db: Session) -> dict[str, str]
     return authentication_token_from_email(
         client=client, email=settings.EMAIL_TEST_USER, db=db
     )
+
+
+@pytest.fixture
+def smtp_server() -> Generator[SMTPState, None, None]:
+    server = FakeSMTPServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    with (
+        patch("app.core.config.settings.SMTP_HOST", "127.0.0.1"),
+        patch("app.core.config.settings.SMTP_PORT", server.port),
+        patch("app.core.config.settings.SMTP_TLS", False),
+        patch("app.core.config.settings.SMTP_SSL", False),
+        patch("app.core.config.settings.SMTP_USER", None),
+        patch("app.core.config.settings.SMTP_PASSWORD", None),
+    ):
+        yield server.state
+    server.shutdown()
+    server.server_close()
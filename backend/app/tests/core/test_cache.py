@@ -0,0 +1,124 @@
+import asyncio
+import threading
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from app.core.cache import (
+    CachedResponse,
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    ResponseCache,
+    TTLCache,
+    get_response_cache,
+)
+from app.core.config import settings
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_cache_expires_entries() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10)
+    with patch("app.core.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=30)
+    with patch("app.core.cache.time.monotonic", return_value=120.0):
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+    assert cache.stats()["expirations"] == 1
+
+
+def test_cache_disabled() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=0, ttl=10)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+        self.threads: set[int] = set()
+
+    def get(self, key: str) -> bytes | None:
+        self.threads.add(threading.get_ident())
+        return self.data.get(key)
+
+    def set(self, key: str, value: bytes, px: int) -> None:
+        assert px > 0
+        self.data[key] = value
+
+    def incr(self, key: str) -> int:
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+
+def test_response_cache_generations() -> None:
+    cache = ResponseCache(RedisCacheBackend(FakeRedis()), ttl=30)
+    params = {"skip": 0, "limit": 10, "cursor": None}
+    key = cache.key("articles", params, tables=["article"])
+    assert key == cache.key("articles", {"limit": 10, "skip": 0}, tables=["article"])
+    assert cache.get(key) is None
+
+    response = CachedResponse(
+        content=b'{"data": []}',
+        etag='"abc"',
+        last_modified=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+    cache.set(key, response)
+    assert cache.get(key) == response
+
+    cache.bump("articletype")
+    assert cache.key("articles", params, tables=["article"]) == key
+    cache.bump("article")
+    new_key = cache.key("articles", params, tables=["article"])
+    assert new_key != key
+    assert cache.get(new_key) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_response_cache_async_off_event_loop() -> None:
+    redis = FakeRedis()
+    cache = ResponseCache(RedisCacheBackend(redis), ttl=30)
+    response = CachedResponse(content=b"[]", etag='"abc"')
+
+    async def lookup_twice() -> tuple[CachedResponse | None, int]:
+        key, cached = await cache.lookup_async("articles", {}, tables=["article"])
+        assert cached is None
+        await cache.set_async(key, response)
+        key, cached = await cache.lookup_async("articles", {}, tables=["article"])
+        await cache.bump_async("article")
+        return cached, threading.get_ident()
+
+    cached, loop_thread = asyncio.run(lookup_twice())
+    assert cached == response
+    assert redis.threads and loop_thread not in redis.threads
+    assert cache.generation("article") == 1
+
+
+def test_response_cache_memory_backend() -> None:
+    cache = ResponseCache(MemoryCacheBackend(maxsize=10), ttl=30)
+    key = cache.key("article_types", {}, tables=["articletype"])
+    cache.set(key, CachedResponse(content=b"[]", etag='"abc"'))
+    assert cache.get(key) == CachedResponse(content=b"[]", etag='"abc"')
+    cache.bump("articletype")
+    assert cache.get(cache.key("article_types", {}, tables=["articletype"])) is None
+
+
+def test_memory_response_cache_ttl_capped() -> None:
+    cache = get_response_cache("memory://", ttl=30)
+    assert cache.ttl == min(30, settings.ARTICLE_CACHE_TTL_SECONDS)
+    assert get_response_cache("memory://", ttl=0).ttl == 0
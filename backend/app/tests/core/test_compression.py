@@ -0,0 +1,107 @@
+import gzip
+import zlib
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.compression import COMPRESSORS, compression_stats, negotiate
+from app.core.config import settings
+from app.tests.utils.item import create_random_item
+
+
+def test_negotiate_weights() -> None:
+    available = ["zstd", "br", "gzip"]
+    assert negotiate("gzip, deflate", available) == "gzip"
+    assert negotiate("gzip, br", available) == "br"
+    assert negotiate("br;q=0.5, gzip", available) == "gzip"
+    assert negotiate("GZIP; Q=0.8, br;q=0", available) == "gzip"
+    assert negotiate("*", available) == "zstd"
+    assert negotiate("*;q=0.1, gzip;q=0", available) == "zstd"
+    assert negotiate("identity", available) is None
+    assert negotiate("gzip;q=0", available) is None
+    assert negotiate("", available) is None
+
+
+def create_large_page(db: Session) -> None:
+    for _ in range(10):
+        create_random_item(db)
+
+
+def test_compressed_list(client: TestClient, db: Session) -> None:
+    create_large_page(db)
+    url = f"{settings.API_V1_STR}/articles/"
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+    assert int(plain.headers["content-length"]) >= settings.COMPRESSION_MINIMUM_SIZE
+
+    r = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert int(r.headers["content-length"]) < int(plain.headers["content-length"])
+    assert r.json() == plain.json()
+    assert r.headers["etag"] == f"W/{plain.headers['etag']}"
+
+    r = client.get(
+        url,
+        headers={"Accept-Encoding": "gzip", "If-None-Match": r.headers["etag"]},
+    )
+    assert r.status_code == 304
+
+    stats = compression_stats.stats()[url]["gzip"]
+    assert stats["responses"] >= 1
+    assert stats["bytes_saved"] > 0
+
+
+def test_small_responses_not_compressed(client: TestClient) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/health-check/",
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert r.status_code == 200
+    assert "content-encoding" not in r.headers
+    assert "vary" not in r.headers
+
+
+def test_gzip_compressor_flushes_each_chunk() -> None:
+    compressor = COMPRESSORS["gzip"](6)
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for chunk in (b'{"id": 1}\n' * 50, b'{"id": 2}\n' * 50):
+        # Decodable without waiting for the rest of the stream
+        assert decompressor.decompress(compressor.compress(chunk)) == chunk
+    assert decompressor.decompress(compressor.finish()) == b""
+    assert decompressor.eof
+
+
+def test_streamed_export_compressed(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_large_page(db)
+    url = f"{settings.API_V1_STR}/articles/export"
+    plain = client.get(
+        url, headers={**superuser_token_headers, "Accept-Encoding": "identity"}
+    )
+    assert plain.status_code == 200
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+    r = client.get(url, headers={**superuser_token_headers, "Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert "content-length" not in r.headers
+    assert r.content == plain.content
+    assert r.content.count(b"\n") >= 10
+
+    stats = compression_stats.stats()[url]["gzip"]
+    assert stats["responses"] >= 1
+    assert stats["bytes_saved"] > 0
+
+    r = client.get(
+        url,
+        headers={**superuser_token_headers, "Accept-Encoding": "gzip"},
+        params={"gzip": True},
+    )
+    # Compressed once, by the route
+    assert "content-encoding" not in r.headers
+    assert gzip.decompress(r.content).count(b"\n") >= 10
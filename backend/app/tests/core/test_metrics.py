@@ -0,0 +1,18 @@
+from app.core.metrics import Histogram
+
+
+def test_histogram_cumulative_buckets() -> None:
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    stats = histogram.stats()
+    assert stats["count"] == 4
+    assert stats["max"] == 3.0
+    assert abs(stats["sum"] - 3.65) < 1e-9
+    assert stats["buckets"] == {"0.1": 2, "1.0": 3, "+Inf": 4}
+
+
+def test_histogram_empty() -> None:
+    stats = Histogram().stats()
+    assert stats["count"] == 0
+    assert stats["buckets"]["+Inf"] == 0
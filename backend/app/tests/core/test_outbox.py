@@ -0,0 +1,63 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import Session, delete
+
+from app.core.outbox import EmailOutboxWorker, retry_delay
+from app.models import EmailOutbox, get_datetime_utc
+from app.tests.utils.smtp import SMTPState
+
+
+def queue(db: Session, count: int) -> list[EmailOutbox]:
+    db.exec(delete(EmailOutbox))  # type: ignore
+    emails = [
+        EmailOutbox(email_to=f"user{i}@example.com", subject="Hi", html_content="<p>")
+        for i in range(count)
+    ]
+    db.add_all(emails)
+    db.commit()
+    return emails
+
+
+def test_outbox_reuses_smtp_connection(db: Session, smtp_server: SMTPState) -> None:
+    emails = queue(db, 3)
+    worker = EmailOutboxWorker(batch_size=10, poll_interval=1)
+    assert worker.process_batch() == 3
+    worker.close_smtp()
+    assert len(smtp_server.emails) == 3
+    assert smtp_server.connections == 1
+    for email in emails:
+        db.refresh(email)
+        assert email.sent_at is not None
+        assert email.next_attempt_at is None
+    assert worker.process_batch() == 0
+
+
+@pytest.mark.usefixtures("smtp_server")
+def test_outbox_retries_with_backoff(db: Session) -> None:
+    [email] = queue(db, 1)
+    worker = EmailOutboxWorker(batch_size=10, poll_interval=1)
+    # Nothing listens on port 1
+    with patch("app.core.config.settings.SMTP_PORT", 1):
+        before = get_datetime_utc()
+        assert worker.process_batch() == 1
+    db.refresh(email)
+    assert email.attempts == 1
+    assert email.sent_at is None
+    assert email.last_error
+    assert email.next_attempt_at is not None
+    assert email.next_attempt_at >= before + retry_delay(1)
+    # Not due yet
+    assert worker.process_batch() == 0
+    assert worker.stats()["retried"] == 1
+
+
+def test_retry_delay_is_capped() -> None:
+    with (
+        patch("app.core.config.settings.EMAIL_RETRY_BASE_SECONDS", 10),
+        patch("app.core.config.settings.EMAIL_RETRY_MAX_SECONDS", 60),
+    ):
+        assert retry_delay(1) == timedelta(seconds=10)
+        assert retry_delay(3) == timedelta(seconds=40)
+        assert retry_delay(10) == timedelta(seconds=60)
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.core.security import PasswordHasher, PasswordHasherBusy
+
+
+def test_password_hasher_runs_in_process() -> None:
+    hasher = PasswordHasher(workers=1, queue_limit=0)
+    try:
+        assert hasher.run(pow, 2, 10) == 1024
+        assert hasher.stats()["duration_seconds"]["count"] == 1
+        assert hasher.stats()["in_flight"] == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_password_hasher_inline() -> None:
+    hasher = PasswordHasher(workers=0, queue_limit=0)
+    assert hasher.run(pow, 2, 3) == 8
+    assert hasher.stats()["duration_seconds"]["count"] == 1
+
+
+def test_password_hasher_refuses_past_queue_limit() -> None:
+    hasher = PasswordHasher(workers=1, queue_limit=0)
+    busy = threading.Thread(target=hasher.run, args=(time.sleep, 1))
+    busy.start()
+    try:
+        while hasher.stats()["in_flight"] == 0:
+            time.sleep(0.01)
+        with pytest.raises(PasswordHasherBusy):
+            hasher.run(pow, 2, 3)
+        assert hasher.stats()["rejected"] == 1
+    finally:
+        busy.join()
+        hasher.shutdown()
+
+
+def test_password_hasher_run_async() -> None:
+    hasher = PasswordHasher(workers=1, queue_limit=0)
+
+    async def run_twice() -> list[int]:
+        # The second call is refused while the first is awaited
+        first = asyncio.ensure_future(hasher.run_async(pow, 2, 10))
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.run_async(pow, 2, 3)
+        return [await first, await hasher.run_async(pow, 2, 3)]
+
+    try:
+        assert asyncio.run(run_twice()) == [1024, 8]
+        assert hasher.stats()["in_flight"] == 0
+        assert hasher.stats()["duration_seconds"]["count"] == 2
+    finally:
+        hasher.shutdown()
+
+
+def test_password_hasher_replaces_broken_pool() -> None:
+    hasher = PasswordHasher(workers=1, queue_limit=0)
+    try:
+        assert hasher.run(pow, 2, 10) == 1024
+        # The hashing process dies, as if killed for running out of memory
+        with pytest.raises(BrokenProcessPool):
+            hasher.run(os._exit, 1)
+        assert hasher.run(pow, 2, 3) == 8
+        assert asyncio.run(hasher.run_async(pow, 2, 4)) == 16
+        assert hasher.stats()["restarts"] == 1
+        assert hasher.stats()["in_flight"] == 0
+    finally:
+        hasher.shutdown()
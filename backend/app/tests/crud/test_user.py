@@ -1,7 +1,9 @@
 from fastapi.encoders import jsonable_encoder
+from passlib.hash import bcrypt
 from sqlmodel import Session
 
 from app import crud
+from app.core.config import settings
 from app.core.security import verify_password
 from app.models import User, UserCreate, UserUpdate
 from app.tests.utils.utils import random_email, random_lower_string
@@ -26,6 +28,24 @@ def test_authenticate_user(db: Session) -> None:
     assert user.email == authenticated_user.email
 
 
+def test_authenticate_user_rehashes_stale_hash(db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=UserCreate(email=email, password=password)
+    )
+    stale_rounds = 4 if settings.BCRYPT_ROUNDS != 4 else 5
+    user.hashed_password = bcrypt.using(rounds=stale_rounds).hash(password)
+    db.add(user)
+    db.commit()
+    authenticated_user = crud.authenticate(session=db, email=email, password=password)
+    assert authenticated_user
+    assert bcrypt.from_string(authenticated_user.hashed_password).rounds == (
+        settings.BCRYPT_ROUNDS
+    )
+    assert verify_password(password, authenticated_user.hashed_password)
+
+
 def test_not_authenticate_user(db: Session) -> None:
     email = random_email()
     password = random_lower_string()
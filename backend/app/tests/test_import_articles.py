@@ -0,0 +1,50 @@
+import codecs
+import io
+
+from sqlmodel import Session, func, select
+
+from app.core.db import engine
+from app.import_articles import import_articles, read_records
+from app.models import Article, ArticleImportReport
+from app.tests.utils.item import create_random_article_type
+from app.tests.utils.user import create_random_user
+
+
+def test_import_articles_in_chunks(db: Session) -> None:
+    article_type = create_random_article_type(db)
+    owner = create_random_user(db)
+    stream = io.StringIO(
+        "".join(
+            f'{{"title": "Report {i}", "article_type_id": "{article_type.id}"}}\n'
+            for i in range(5)
+        )
+    )
+    progress: list[int] = []
+
+    def on_progress(report: ArticleImportReport) -> None:
+        progress.append(report.imported)
+
+    with engine.connect() as connection:
+        report = import_articles(
+            connection=connection,
+            stream=stream,
+            format="ndjson",
+            owner_id=owner.id,
+            chunk_size=2,
+            on_progress=on_progress,
+        )
+    assert report.imported == 5
+    assert progress == [2, 4, 5]
+    count = db.exec(select(func.count()).where(Article.owner_id == owner.id)).one()
+    assert count == 5
+
+
+def test_read_records_from_decoded_lines() -> None:
+    # A bare iterator of bytes lines, like an upload that isn't an io object
+    content = 'title,description\r\nFinal,"Extra time,\r\npenalties"\r\nDerby,\r\n'
+    lines = iter(io.BytesIO(content.encode()).readlines())
+    records = list(read_records(codecs.iterdecode(lines, "utf-8"), "csv"))
+    assert records == [
+        (3, {"title": "Final", "description": "Extra time,\r\npenalties"}),
+        (4, {"title": "Derby"}),
+    ]
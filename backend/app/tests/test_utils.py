@@ -0,0 +1,21 @@
+from unittest.mock import patch
+
+from app.utils import email_templates, precompile_email_templates, render_email_template
+
+
+def test_render_email_template() -> None:
+    html_content = render_email_template(
+        template_name="test_email.html",
+        context={"project_name": "Sport news", "email": "fan@example.com"},
+    )
+    assert "Sport news" in html_content
+    assert "fan@example.com" in html_content
+
+
+def test_precompiled_templates_render_without_io() -> None:
+    precompile_email_templates()
+    with patch.object(email_templates.loader, "get_source", side_effect=AssertionError):
+        render_email_template(
+            template_name="new_account.html",
+            context={"project_name": "Sport news", "username": "fan"},
+        )
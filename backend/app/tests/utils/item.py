@@ -1,16 +1,31 @@
 from sqlmodel import Session
 
 from app import crud
-from app.models import Article, ArticleCreate
+from app.models import Article, ArticleCreate, ArticleType
 from app.tests.utils.user import create_random_user
 from app.tests.utils.utils import random_lower_string
 
 
-def create_random_item(db: Session) -> Article:
+def create_random_article_type(db: Session) -> ArticleType:
+    article_type = ArticleType(name=random_lower_string())
+    db.add(article_type)
+    db.commit()
+    db.refresh(article_type)
+    return article_type
+
+
+def create_random_item(db: Session, article_type: ArticleType | None = None) -> Article:
     user = create_random_user(db)
     owner_id = user.id
     assert owner_id is not None
+    if article_type is None:
+        article_type = create_random_article_type(db)
     title = random_lower_string()
     description = random_lower_string()
     item_in = ArticleCreate(title=title, description=description)
-    return crud.create_item(session=db, item_in=item_in, owner_id=owner_id)
+    return crud.create_item(
+        session=db,
+        item_in=item_in,
+        owner_id=owner_id,
+        article_type_id=article_type.id,
+    )
@@ -0,0 +1,83 @@
+import socketserver
+import threading
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ReceivedEmail:
+    mail_from: str
+    rcpt_to: list[str]
+    data: str
+
+
+@dataclass
+class SMTPState:
+    emails: list[ReceivedEmail] = field(default_factory=list)
+    connections: int = 0
+    received: threading.Condition = field(default_factory=threading.Condition)
+
+    def wait_for(self, count: int, timeout: float = 5) -> bool:
+        with self.received:
+            return self.received.wait_for(lambda: len(self.emails) >= count, timeout)
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """
+    Just enough of SMTP for smtplib to deliver plain text mail.
+    """
+
+    server: "FakeSMTPServer"
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        state = self.server.state
+        with state.received:
+            state.connections += 1
+        self.reply("220 localhost fake SMTP")
+        mail_from = ""
+        rcpt_to: list[str] = []
+        while line := self.rfile.readline():
+            command = line.decode().strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250 8BITMIME")
+            elif verb in ("HELO", "NOOP", "RSET"):
+                self.reply("250 OK")
+            elif verb == "MAIL":
+                mail_from, rcpt_to = command.split(":", 1)[1].strip(), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                rcpt_to.append(command.split(":", 1)[1].strip())
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while (data_line := self.rfile.readline()) not in (b".\r\n", b""):
+                    lines.append(data_line.decode())
+                with state.received:
+                    state.emails.append(
+                        ReceivedEmail(mail_from, rcpt_to, "".join(lines))
+                    )
+                    state.received.notify_all()
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.state = SMTPState()
+
+    @property
+    def port(self) -> int:
+        return int(self.server_address[1])
@@ -1,3 +1,6 @@
+import base64
+import binascii
+import json
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
@@ -6,7 +9,7 @@ from typing import Any
 
 import emails  # type: ignore
 import jwt
-from jinja2 import Template
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from jwt.exceptions import InvalidTokenError
 
 from app.core import security
@@ -22,37 +25,64 @@ class EmailData:
     subject: str
 
 
+# Templates are compiled once and never checked for changes on disk again
+email_templates = Environment(
+    loader=FileSystemLoader(Path(__file__).parent / "email-templates" / "build"),
+    auto_reload=False,
+    cache_size=64,
+    bytecode_cache=FileSystemBytecodeCache(settings.EMAIL_TEMPLATES_BYTECODE_DIR)
+    if settings.EMAIL_TEMPLATES_BYTECODE_DIR
+    else None,
+)
+
+
+def precompile_email_templates() -> None:
+    for template_name in email_templates.list_templates():
+        email_templates.get_template(template_name)
+
+
 def render_email_template(*, template_name: str, context: dict[str, Any]) -> str:
-    template_str = (
-        Path(__file__).parent / "email-templates" / "build" / template_name
-    ).read_text()
-    html_content = Template(template_str).render(context)
+    template = email_templates.get_template(template_name)
+    html_content = template.render(context)
     return html_content
 
 
+def get_smtp_options() -> dict[str, Any]:
+    smtp_options: dict[str, Any] = {
+        "host": settings.SMTP_HOST,
+        "port": settings.SMTP_PORT,
+    }
+    if settings.SMTP_TLS:
+        smtp_options["tls"] = True
+    elif settings.SMTP_SSL:
+        smtp_options["ssl"] = True
+    if settings.SMTP_USER:
+        smtp_options["user"] = settings.SMTP_USER
+    if settings.SMTP_PASSWORD:
+        smtp_options["password"] = settings.SMTP_PASSWORD
+    return smtp_options
+
+
 def send_email(
     *,
     email_to: str,
     subject: str = "",
     html_content: str = "",
-) -> None:
+    smtp: Any = None,
+) -> Any:
+    """
+    Send an email right away, over `smtp` when given an open emails SMTPBackend.
+    Routes queue emails with app.core.outbox.queue_email instead.
+    """
     assert settings.emails_enabled, "no provided configuration for email variables"
     message = emails.Message(
         subject=subject,
         html=html_content,
         mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
     )
-    smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
-    if settings.SMTP_TLS:
-        smtp_options["tls"] = True
-    elif settings.SMTP_SSL:
-        smtp_options["ssl"] = True
-    if settings.SMTP_USER:
-        smtp_options["user"] = settings.SMTP_USER
-    if settings.SMTP_PASSWORD:
-        smtp_options["password"] = settings.SMTP_PASSWORD
-    response = message.send(to=email_to, smtp=smtp_options)
+    response = message.send(to=email_to, smtp=smtp or get_smtp_options())
     logger.info(f"send email result: {response}")
+    return response
 
 
 def generate_test_email(email_to: str) -> EmailData:
@@ -121,3 +151,22 @@ def verify_password_reset_token(token: str) -> str | None:
         return str(decoded_token["sub"])
     except InvalidTokenError:
         return None
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Build an opaque pagination cursor from the sort key of the last row.
+    """
+    raw = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[str] | None:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+        return None
+    return values